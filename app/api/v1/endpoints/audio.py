@@ -3,6 +3,8 @@ Audio Studio APIs - Audio processing endpoints
 """
 
 from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from typing import List, Optional
 import uuid
 import os
@@ -12,7 +14,10 @@ from app.models.schemas import (
     ConversionResponse, FileInfo
 )
 from app.core.config import settings
-from app.services.audio_service import AudioService
+from app.core.streaming import primed
+from app.core.uploads import remove_upload, save_upload_file, save_upload_files, upload_path
+from app.services.audio_service import AudioService, STREAM_FORMATS
+from app.services.ffmpeg_utils import FFMPEG_AVAILABLE, probe_streams
 
 router = APIRouter()
 audio_service = AudioService()
@@ -37,12 +42,9 @@ async def convert_audio(
             )
         
         # Save uploaded file
-        file_id = str(uuid.uuid4())
-        input_path = os.path.join(settings.TEMP_DIR, f"{file_id}_{file.filename}")
+        input_path = upload_path(settings.TEMP_DIR, file.filename)
         
-        with open(input_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        await save_upload_file(file, input_path)
         
         # Generate output filename
         conversion_id = str(uuid.uuid4())
@@ -78,6 +80,53 @@ async def convert_audio(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/convert/stream")
+async def convert_audio_stream(
+    file: UploadFile = File(..., description="Audio file to convert"),
+    target_format: str = "mp3",
+    bitrate: Optional[int] = None,
+    sample_rate: Optional[int] = None
+):
+    """
+    Convert audio file and stream the result back as it is encoded,
+    without storing the output for a later download
+    """
+    if not FFMPEG_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Audio streaming requires ffmpeg")
+    
+    # Validate target format
+    if target_format not in STREAM_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported target format. Supported: {list(STREAM_FORMATS)}"
+        )
+    
+    # Save uploaded file
+    file_id = str(uuid.uuid4())
+    input_path = upload_path(settings.TEMP_DIR, file.filename, file_id)
+    
+    await save_upload_file(file, input_path)
+    
+    # Reject what ffmpeg can't read as audio, and start the encode before
+    # answering, so failures get an error status rather than an empty body
+    if not any(stream["type"] == "audio" for stream in await probe_streams(input_path)):
+        await remove_upload(input_path)
+        raise HTTPException(status_code=400, detail="File has no readable audio stream")
+    try:
+        stream = await primed(audio_service.convert_audio_stream(input_path, target_format, bitrate, sample_rate))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Audio conversion failed: {str(e)}")
+    
+    output_filename = f"converted_{file_id}.{target_format}"
+    # The stream removes the input as it finishes; the background task also
+    # covers a client gone before the body was ever started
+    return StreamingResponse(
+        stream,
+        media_type=STREAM_FORMATS[target_format][1],
+        headers={"Content-Disposition": f'attachment; filename="{output_filename}"'},
+        background=BackgroundTask(remove_upload, input_path)
+    )
+
 @router.post("/trim", response_model=ConversionResponse)
 async def trim_audio(
     background_tasks: BackgroundTasks,
@@ -97,12 +146,9 @@ async def trim_audio(
             raise HTTPException(status_code=400, detail="End time must be greater than start time")
         
         # Save uploaded file
-        file_id = str(uuid.uuid4())
-        input_path = os.path.join(settings.TEMP_DIR, f"{file_id}_{file.filename}")
+        input_path = upload_path(settings.TEMP_DIR, file.filename)
         
-        with open(input_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        await save_upload_file(file, input_path)
         
         # Generate output filename
         conversion_id = str(uuid.uuid4())
@@ -154,17 +200,8 @@ async def merge_audio(
                 detail=f"Unsupported output format. Supported: {settings.SUPPORTED_AUDIO_FORMATS}"
             )
         
-        # Save uploaded files
-        file_paths = []
-        for file in files:
-            file_id = str(uuid.uuid4())
-            file_path = os.path.join(settings.TEMP_DIR, f"{file_id}_{file.filename}")
-            
-            with open(file_path, "wb") as buffer:
-                content = await file.read()
-                buffer.write(content)
-            
-            file_paths.append(file_path)
+        # Save uploaded files concurrently
+        file_paths = await save_upload_files(files, settings.TEMP_DIR)
         
         # Generate output filename
         conversion_id = str(uuid.uuid4())
@@ -213,12 +250,9 @@ async def adjust_volume(
             raise HTTPException(status_code=400, detail="Volume change must be between -50dB and +50dB")
         
         # Save uploaded file
-        file_id = str(uuid.uuid4())
-        input_path = os.path.join(settings.TEMP_DIR, f"{file_id}_{file.filename}")
+        input_path = upload_path(settings.TEMP_DIR, file.filename)
         
-        with open(input_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        await save_upload_file(file, input_path)
         
         # Generate output filename
         conversion_id = str(uuid.uuid4())
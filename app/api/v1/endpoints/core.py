@@ -5,17 +5,20 @@ Core System APIs - Core system endpoints
 from fastapi import APIRouter, UploadFile, File, HTTPException, Response
 from fastapi.responses import FileResponse
 from typing import List, Dict, Any
+import asyncio
 import uuid
 import os
 import time
 import shutil
 from datetime import datetime
+from urllib.parse import quote
 
 from app.models.schemas import (
     UploadResponse, FileInfo, HealthResponse, UsageStats,
     BaseResponse, ConversionProgress
 )
 from app.core.config import settings
+from app.core.uploads import UPLOAD_CHUNK_SIZE, save_upload_file, upload_path
 
 router = APIRouter()
 
@@ -23,32 +26,32 @@ router = APIRouter()
 conversion_status_storage: Dict[str, Dict] = {}
 upload_storage: Dict[str, Dict] = {}
 
+# Every extension the API accepts, built once rather than per validation
+ALL_SUPPORTED_FORMATS = (
+    settings.SUPPORTED_PDF_FORMATS +
+    settings.SUPPORTED_IMAGE_FORMATS +
+    settings.SUPPORTED_AUDIO_FORMATS +
+    settings.SUPPORTED_VIDEO_FORMATS
+)
+_ALL_SUPPORTED_FORMAT_SET = frozenset(ALL_SUPPORTED_FORMATS)
+
 @router.post("/upload", response_model=UploadResponse)
 async def upload_file(file: UploadFile = File(..., description="File to upload")):
     """
     Upload a file to the system
     """
     try:
-        # Check file size
-        content = await file.read()
-        if len(content) > settings.MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=413, 
-                detail=f"File size exceeds maximum allowed size of {settings.MAX_FILE_SIZE / (1024*1024):.1f}MB"
-            )
-        
         # Generate unique file ID
         file_id = str(uuid.uuid4())
         
-        # Save file
-        file_path = os.path.join(settings.UPLOAD_DIR, f"{file_id}_{file.filename}")
-        with open(file_path, "wb") as buffer:
-            buffer.write(content)
+        # Stream the file to disk, checking its size as it arrives
+        file_path = upload_path(settings.UPLOAD_DIR, file.filename, file_id)
+        size = await save_upload_file(file, file_path, max_size=settings.MAX_FILE_SIZE)
         
         # Store file info
         file_info = FileInfo(
             filename=file.filename,
-            size=len(content),
+            size=size,
             format=os.path.splitext(file.filename)[1][1:].lower(),
             mime_type=file.content_type or "application/octet-stream"
         )
@@ -66,6 +69,8 @@ async def upload_file(file: UploadFile = File(..., description="File to upload")
             file_info=file_info
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -84,15 +89,36 @@ async def download_file(conversion_id: str):
             raise HTTPException(status_code=400, detail="Conversion not completed yet")
         
         output_path = conversion_info["output_path"]
-        if not os.path.exists(output_path):
+        try:
+            stat_result = os.stat(output_path)
+        except FileNotFoundError:
             raise HTTPException(status_code=404, detail="File not found")
         
-        # Return file
         filename = conversion_info.get("filename", "converted_file")
+        
+        # Behind nginx, let it send the file straight from disk and free
+        # this worker as soon as the headers are out
+        if settings.X_ACCEL_REDIRECT_PREFIX:
+            quoted_filename = quote(filename)
+            if quoted_filename != filename:
+                content_disposition = f"attachment; filename*=utf-8''{quoted_filename}"
+            else:
+                content_disposition = f'attachment; filename="{filename}"'
+            relative_path = os.path.relpath(output_path, settings.OUTPUT_DIR).replace(os.sep, "/")
+            return Response(
+                media_type="application/octet-stream",
+                headers={
+                    "X-Accel-Redirect": settings.X_ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + quote(relative_path),
+                    "Content-Disposition": content_disposition
+                }
+            )
+        
+        # Return file; passing the stat saves FileResponse a second one
         return FileResponse(
             path=output_path,
             filename=filename,
-            media_type="application/octet-stream"
+            media_type="application/octet-stream",
+            stat_result=stat_result
         )
         
     except HTTPException:
@@ -163,9 +189,11 @@ async def get_usage_stats():
             if os.path.exists(path):
                 for dirpath, dirnames, filenames in os.walk(path):
                     for filename in filenames:
-                        filepath = os.path.join(dirpath, filename)
-                        if os.path.exists(filepath):
-                            total_size += os.path.getsize(filepath)
+                        # Files can vanish mid-walk as requests finish
+                        try:
+                            total_size += os.path.getsize(os.path.join(dirpath, filename))
+                        except FileNotFoundError:
+                            pass
             return total_size
         
         upload_size = get_directory_size(settings.UPLOAD_DIR)
@@ -190,28 +218,42 @@ async def get_usage_stats():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _remove_old_files() -> int:
+    """
+    Empty the temp directory and delete uploads and outputs older than 24
+    hours; returns how many of the latter were removed. Blocking.
+    """
+    # Clean temp directory
+    if os.path.exists(settings.TEMP_DIR):
+        shutil.rmtree(settings.TEMP_DIR)
+        os.makedirs(settings.TEMP_DIR, exist_ok=True)
+    
+    # Clean old files from upload and output directories (older than 24 hours)
+    cutoff_time = time.time() - (24 * 60 * 60)  # 24 hours ago
+    
+    cleaned_count = 0
+    for directory in [settings.UPLOAD_DIR, settings.OUTPUT_DIR]:
+        if os.path.exists(directory):
+            # A file removed by a request meanwhile is skipped rather
+            # than failing the whole cleanup
+            for entry in os.scandir(directory):
+                try:
+                    if entry.is_file() and entry.stat().st_ctime < cutoff_time:
+                        os.unlink(entry.path)
+                        cleaned_count += 1
+                except FileNotFoundError:
+                    pass
+    
+    return cleaned_count
+
 @router.post("/cleanup", response_model=BaseResponse)
 async def cleanup_temporary_files():
     """
     Clean up temporary files and old conversions
     """
     try:
-        # Clean temp directory
-        if os.path.exists(settings.TEMP_DIR):
-            shutil.rmtree(settings.TEMP_DIR)
-            os.makedirs(settings.TEMP_DIR, exist_ok=True)
-        
-        # Clean old files from upload and output directories (older than 24 hours)
-        cutoff_time = time.time() - (24 * 60 * 60)  # 24 hours ago
-        
-        cleaned_count = 0
-        for directory in [settings.UPLOAD_DIR, settings.OUTPUT_DIR]:
-            if os.path.exists(directory):
-                for filename in os.listdir(directory):
-                    filepath = os.path.join(directory, filename)
-                    if os.path.isfile(filepath) and os.path.getctime(filepath) < cutoff_time:
-                        os.remove(filepath)
-                        cleaned_count += 1
+        # Thousands of unlinks would stall every other request; run them in a thread
+        cleaned_count = await asyncio.to_thread(_remove_old_files)
         
         return BaseResponse(
             success=True,
@@ -244,9 +286,10 @@ async def validate_file(file: UploadFile = File(..., description="File to valida
     Validate file type and size without uploading
     """
     try:
-        # Check file size
-        content = await file.read()
-        file_size = len(content)
+        # Check file size, counting chunks rather than holding the whole file
+        file_size = 0
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            file_size += len(chunk)
         
         if file_size > settings.MAX_FILE_SIZE:
             return {
@@ -256,17 +299,10 @@ async def validate_file(file: UploadFile = File(..., description="File to valida
         
         # Check file type
         file_ext = os.path.splitext(file.filename)[1][1:].lower()
-        all_supported_formats = (
-            settings.SUPPORTED_PDF_FORMATS + 
-            settings.SUPPORTED_IMAGE_FORMATS + 
-            settings.SUPPORTED_AUDIO_FORMATS + 
-            settings.SUPPORTED_VIDEO_FORMATS
-        )
-        
-        if file_ext not in all_supported_formats:
+        if file_ext not in _ALL_SUPPORTED_FORMAT_SET:
             return {
                 "valid": False,
-                "reason": f"File type '{file_ext}' is not supported. Supported formats: {all_supported_formats}"
+                "reason": f"File type '{file_ext}' is not supported. Supported formats: {ALL_SUPPORTED_FORMATS}"
             }
         
         return {
@@ -12,6 +12,7 @@ from app.models.schemas import (
     ConversionResponse, FileInfo
 )
 from app.core.config import settings
+from app.core.uploads import save_upload_file, upload_path
 from app.services.image_service import ImageService
 
 router = APIRouter()
@@ -40,12 +41,9 @@ async def convert_image(
             raise HTTPException(status_code=400, detail="Quality must be between 10 and 100")
         
         # Save uploaded file
-        file_id = str(uuid.uuid4())
-        input_path = os.path.join(settings.TEMP_DIR, f"{file_id}_{file.filename}")
+        input_path = upload_path(settings.TEMP_DIR, file.filename)
         
-        with open(input_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        await save_upload_file(file, input_path)
         
         # Generate output filename
         conversion_id = str(uuid.uuid4())
@@ -102,12 +100,9 @@ async def resize_image(
             raise HTTPException(status_code=400, detail="Height must be positive")
         
         # Save uploaded file
-        file_id = str(uuid.uuid4())
-        input_path = os.path.join(settings.TEMP_DIR, f"{file_id}_{file.filename}")
+        input_path = upload_path(settings.TEMP_DIR, file.filename)
         
-        with open(input_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        await save_upload_file(file, input_path)
         
         # Generate output filename
         conversion_id = str(uuid.uuid4())
@@ -165,12 +160,9 @@ async def crop_image(
             raise HTTPException(status_code=400, detail="Width and height must be positive")
         
         # Save uploaded file
-        file_id = str(uuid.uuid4())
-        input_path = os.path.join(settings.TEMP_DIR, f"{file_id}_{file.filename}")
+        input_path = upload_path(settings.TEMP_DIR, file.filename)
         
-        with open(input_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        await save_upload_file(file, input_path)
         
         # Generate output filename
         conversion_id = str(uuid.uuid4())
@@ -215,12 +207,9 @@ async def remove_background(
     """
     try:
         # Save uploaded file
-        file_id = str(uuid.uuid4())
-        input_path = os.path.join(settings.TEMP_DIR, f"{file_id}_{file.filename}")
+        input_path = upload_path(settings.TEMP_DIR, file.filename)
         
-        with open(input_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        await save_upload_file(file, input_path)
         
         # Generate output filename (always PNG for transparency)
         conversion_id = str(uuid.uuid4())
@@ -271,12 +260,9 @@ async def compress_image(
             raise HTTPException(status_code=400, detail="Quality must be between 10 and 100")
         
         # Save uploaded file
-        file_id = str(uuid.uuid4())
-        input_path = os.path.join(settings.TEMP_DIR, f"{file_id}_{file.filename}")
+        input_path = upload_path(settings.TEMP_DIR, file.filename)
         
-        with open(input_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        original_size = await save_upload_file(file, input_path)
         
         # Generate output filename
         conversion_id = str(uuid.uuid4())
@@ -291,7 +277,6 @@ async def compress_image(
         
         if success:
             # Get file info
-            original_size = os.path.getsize(input_path)
             compressed_size = os.path.getsize(output_path)
             compression_ratio = ((original_size - compressed_size) / original_size) * 100
             
@@ -3,8 +3,10 @@ PDF Hub APIs - PDF processing endpoints
 """
 
 from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks, Depends
-from fastapi.responses import FileResponse
-from typing import List, Dict, Any
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from typing import List, Dict, Any, Optional
+import hashlib
 import uuid
 import os
 from pathlib import Path
@@ -14,12 +16,36 @@ from app.models.schemas import (
     ConversionResponse, BaseResponse, FileInfo
 )
 from app.core.config import settings
-from app.services.pdf_service import PDFService
+from app.core.result_cache import result_key, run_cached
+from app.core.streaming import primed
+from app.core.uploads import read_head, remove_upload, save_upload_file, save_upload_files, upload_path
+from app.services.pdf_service import PDFIUM_AVAILABLE, PIKEPDF_AVAILABLE, PDFService
 from app.api.v1.endpoints.auth import get_current_user
 
 router = APIRouter()
 pdf_service = PDFService()
 
+async def _is_pdf(file: UploadFile) -> bool:
+    """
+    Check the name and the content signature, before anything is written to
+    disk; PDF readers accept the header anywhere in the first kilobyte
+    """
+    return file.filename.lower().endswith('.pdf') and b"%PDF-" in await read_head(file)
+
+def _parse_pages(pages: Optional[str]) -> List[int]:
+    """
+    Page numbers from a comma-separated list of pages and ranges like "1,3,5-10"
+    """
+    page_list = []
+    if pages:
+        for page_part in pages.split(','):
+            if '-' in page_part:
+                start, end = map(int, page_part.split('-'))
+                page_list.extend(range(start, end + 1))
+            else:
+                page_list.append(int(page_part))
+    return page_list
+
 @router.post("/merge", response_model=ConversionResponse)
 async def merge_pdfs(
     background_tasks: BackgroundTasks,
@@ -33,20 +59,11 @@ async def merge_pdfs(
     try:
         # Validate all files are PDFs
         for file in files:
-            if not file.filename.lower().endswith('.pdf'):
+            if not await _is_pdf(file):
                 raise HTTPException(status_code=400, detail=f"File {file.filename} is not a PDF")
         
-        # Save uploaded files
-        file_paths = []
-        for file in files:
-            file_id = str(uuid.uuid4())
-            file_path = os.path.join(settings.TEMP_DIR, f"{file_id}_{file.filename}")
-            
-            with open(file_path, "wb") as buffer:
-                content = await file.read()
-                buffer.write(content)
-            
-            file_paths.append(file_path)
+        # Save uploaded files concurrently
+        file_paths = await save_upload_files(files, settings.TEMP_DIR)
         
         # Generate output filename
         conversion_id = str(uuid.uuid4())
@@ -79,6 +96,8 @@ async def merge_pdfs(
         else:
             raise HTTPException(status_code=500, detail="Failed to merge PDFs")
             
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -95,26 +114,16 @@ async def split_pdf(
     """
     try:
         # Validate PDF file
-        if not file.filename.lower().endswith('.pdf'):
+        if not await _is_pdf(file):
             raise HTTPException(status_code=400, detail="File must be a PDF")
         
         # Save uploaded file
-        file_id = str(uuid.uuid4())
-        input_path = os.path.join(settings.TEMP_DIR, f"{file_id}_{file.filename}")
+        input_path = upload_path(settings.TEMP_DIR, file.filename)
         
-        with open(input_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        await save_upload_file(file, input_path)
         
         # Parse page ranges
-        page_list = []
-        if pages:
-            for page_part in pages.split(','):
-                if '-' in page_part:
-                    start, end = map(int, page_part.split('-'))
-                    page_list.extend(range(start, end + 1))
-                else:
-                    page_list.append(int(page_part))
+        page_list = _parse_pages(pages)
         
         # Generate output
         conversion_id = str(uuid.uuid4())
@@ -137,9 +146,56 @@ async def split_pdf(
         else:
             raise HTTPException(status_code=500, detail="Failed to split PDF")
             
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/split/stream")
+async def split_pdf_stream(
+    file: UploadFile = File(..., description="PDF file to split"),
+    pages: str = None,  # Comma-separated page numbers or ranges like "1,3,5-10"
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """
+    Split a PDF and stream the pages back as one ZIP archive while they are
+    rendered, without storing them for a later download
+    Requires authentication
+    """
+    if not (PDFIUM_AVAILABLE or PIKEPDF_AVAILABLE):
+        raise HTTPException(status_code=503, detail="PDF streaming requires pypdfium2 or pikepdf")
+    
+    # Validate PDF file
+    if not await _is_pdf(file):
+        raise HTTPException(status_code=400, detail="File must be a PDF")
+    
+    try:
+        page_list = _parse_pages(pages)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid page list")
+    
+    # Save uploaded file
+    file_id = str(uuid.uuid4())
+    input_path = upload_path(settings.TEMP_DIR, file.filename, file_id)
+    
+    await save_upload_file(file, input_path)
+    
+    # Open the document and render the first page before answering, so a
+    # damaged PDF gets an error status rather than an empty archive
+    try:
+        stream = await primed(pdf_service.split_pdf_stream(input_path, page_list))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid or damaged PDF: {str(e)}")
+    
+    # The stream removes the input as it finishes; the background task also
+    # covers a client gone before the body was ever started
+    return StreamingResponse(
+        stream,
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="split_{file_id}.zip"'},
+        background=BackgroundTask(remove_upload, input_path)
+    )
+
 @router.post("/compress", response_model=ConversionResponse)
 async def compress_pdf(
     background_tasks: BackgroundTasks,
@@ -153,7 +209,7 @@ async def compress_pdf(
     """
     try:
         # Validate PDF file
-        if not file.filename.lower().endswith('.pdf'):
+        if not await _is_pdf(file):
             raise HTTPException(status_code=400, detail="File must be a PDF")
         
         # Validate quality parameter
@@ -161,24 +217,26 @@ async def compress_pdf(
             raise HTTPException(status_code=400, detail="Quality must be between 10 and 100")
         
         # Save uploaded file
-        file_id = str(uuid.uuid4())
-        input_path = os.path.join(settings.TEMP_DIR, f"{file_id}_{file.filename}")
+        input_path = upload_path(settings.TEMP_DIR, file.filename)
         
-        with open(input_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        digest = hashlib.sha256()
+        original_size = await save_upload_file(file, input_path, digest=digest)
         
         # Generate output filename
         conversion_id = str(uuid.uuid4())
         output_filename = f"compressed_{conversion_id}.pdf"
         output_path = os.path.join(settings.OUTPUT_DIR, output_filename)
         
-        # Perform compression
-        success = await pdf_service.compress_pdf(input_path, output_path, quality)
+        # Perform compression, reusing the result for a repeated upload
+        success = await run_cached(
+            result_key("pdf-compress", digest.hexdigest(), quality),
+            input_path,
+            output_path,
+            lambda: pdf_service.compress_pdf(input_path, output_path, quality)
+        )
         
         if success:
             # Get file info
-            original_size = os.path.getsize(input_path)
             compressed_size = os.path.getsize(output_path)
             compression_ratio = ((original_size - compressed_size) / original_size) * 100
             
@@ -202,6 +260,8 @@ async def compress_pdf(
         else:
             raise HTTPException(status_code=500, detail="Failed to compress PDF")
             
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -217,24 +277,27 @@ async def pdf_to_word(
     """
     try:
         # Validate PDF file
-        if not file.filename.lower().endswith('.pdf'):
+        if not await _is_pdf(file):
             raise HTTPException(status_code=400, detail="File must be a PDF")
         
         # Save uploaded file
-        file_id = str(uuid.uuid4())
-        input_path = os.path.join(settings.TEMP_DIR, f"{file_id}_{file.filename}")
+        input_path = upload_path(settings.TEMP_DIR, file.filename)
         
-        with open(input_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        digest = hashlib.sha256()
+        await save_upload_file(file, input_path, digest=digest)
         
         # Generate output filename
         conversion_id = str(uuid.uuid4())
         output_filename = f"converted_{conversion_id}.docx"
         output_path = os.path.join(settings.OUTPUT_DIR, output_filename)
         
-        # Perform conversion
-        success = await pdf_service.pdf_to_word(input_path, output_path)
+        # Perform conversion, reusing the result for a repeated upload
+        success = await run_cached(
+            result_key("pdf-to-word", digest.hexdigest()),
+            input_path,
+            output_path,
+            lambda: pdf_service.pdf_to_word(input_path, output_path)
+        )
         
         if success:
             file_size = os.path.getsize(output_path)
@@ -258,5 +321,7 @@ async def pdf_to_word(
         else:
             raise HTTPException(status_code=500, detail="Failed to convert PDF to Word")
             
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
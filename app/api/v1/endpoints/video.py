@@ -12,6 +12,7 @@ from app.models.schemas import (
     ConversionResponse, FileInfo
 )
 from app.core.config import settings
+from app.core.uploads import save_upload_file, upload_path
 from app.services.video_service import VideoService
 
 router = APIRouter()
@@ -41,12 +42,9 @@ async def convert_video(
             raise HTTPException(status_code=400, detail="Quality must be 'low', 'medium', or 'high'")
         
         # Save uploaded file
-        file_id = str(uuid.uuid4())
-        input_path = os.path.join(settings.TEMP_DIR, f"{file_id}_{file.filename}")
+        input_path = upload_path(settings.TEMP_DIR, file.filename)
         
-        with open(input_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        await save_upload_file(file, input_path)
         
         # Generate output filename
         conversion_id = str(uuid.uuid4())
@@ -98,12 +96,9 @@ async def compress_video(
             raise HTTPException(status_code=400, detail="Quality must be between 10 and 100")
         
         # Save uploaded file
-        file_id = str(uuid.uuid4())
-        input_path = os.path.join(settings.TEMP_DIR, f"{file_id}_{file.filename}")
+        input_path = upload_path(settings.TEMP_DIR, file.filename)
         
-        with open(input_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        original_size = await save_upload_file(file, input_path)
         
         # Generate output filename
         conversion_id = str(uuid.uuid4())
@@ -116,7 +111,6 @@ async def compress_video(
         
         if success:
             # Get file info
-            original_size = os.path.getsize(input_path)
             compressed_size = os.path.getsize(output_path)
             compression_ratio = ((original_size - compressed_size) / original_size) * 100
             
@@ -161,12 +155,9 @@ async def trim_video(
             raise HTTPException(status_code=400, detail="End time must be greater than start time")
         
         # Save uploaded file
-        file_id = str(uuid.uuid4())
-        input_path = os.path.join(settings.TEMP_DIR, f"{file_id}_{file.filename}")
+        input_path = upload_path(settings.TEMP_DIR, file.filename)
         
-        with open(input_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        await save_upload_file(file, input_path)
         
         # Generate output filename
         conversion_id = str(uuid.uuid4())
@@ -225,12 +216,9 @@ async def video_to_gif(
             raise HTTPException(status_code=400, detail="FPS must be between 1 and 30")
         
         # Save uploaded file
-        file_id = str(uuid.uuid4())
-        input_path = os.path.join(settings.TEMP_DIR, f"{file_id}_{file.filename}")
+        input_path = upload_path(settings.TEMP_DIR, file.filename)
         
-        with open(input_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        await save_upload_file(file, input_path)
         
         # Generate output filename
         conversion_id = str(uuid.uuid4())
@@ -15,6 +15,10 @@ class Settings(BaseSettings):
     # API settings
     API_V1_STR: str = "/api/v1"
     
+    # Server (Uvicorn worker processes for `python -m app.main`; DEBUG runs
+    # a single auto-reloading worker instead)
+    WORKERS: int = 1
+    
     # Clerk Authentication
     CLERK_PUBLISHABLE_KEY: Optional[str] = None
     CLERK_SECRET_KEY: Optional[str] = None
@@ -27,12 +31,29 @@ class Settings(BaseSettings):
     OUTPUT_DIR: str = "./outputs"
     TEMP_DIR: str = "./temp"
     
+    # Downloads handed to the reverse proxy: an nginx internal location
+    # aliasing OUTPUT_DIR, e.g. "/protected-outputs/" (None = serve from Python)
+    X_ACCEL_REDIRECT_PREFIX: Optional[str] = None
+    
     # Supported file formats
     SUPPORTED_PDF_FORMATS: list = ["pdf"]
     SUPPORTED_IMAGE_FORMATS: list = ["jpg", "jpeg", "png", "webp", "bmp", "tiff", "heic"]
     SUPPORTED_AUDIO_FORMATS: list = ["mp3", "wav", "flac", "aac", "ogg", "m4a"]
     SUPPORTED_VIDEO_FORMATS: list = ["mp4", "webm", "avi", "mov", "mkv", "flv"]
     
+    # ffmpeg binary (None = look up on PATH, then the imageio-ffmpeg copy)
+    FFMPEG_PATH: Optional[str] = None
+    
+    # Video encoding (use NVENC/QSV/VideoToolbox for H.264 when one is usable)
+    VIDEO_HW_ENCODING: bool = True
+    
+    # Address space per CPU-bound worker process, in bytes (None = unlimited);
+    # a job past it fails alone instead of the OOM killer taking the worker
+    PROCESS_WORKER_MEMORY_LIMIT: Optional[int] = 4 * 1024 * 1024 * 1024
+    
+    # Background removal (ONNX Runtime intra-op threads per worker; None = CPUs / workers)
+    REMBG_THREADS: Optional[int] = None
+    
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
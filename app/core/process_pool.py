@@ -0,0 +1,85 @@
+"""
+Worker processes shared by the CPU-bound services
+"""
+
+import asyncio
+import logging
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# CPU-bound work (Pillow/OpenCV images, pure-Python PDF parsing and
+# conversion) runs in worker processes so it neither blocks the event loop
+# nor serializes on the GIL. Workers are spawned lazily on the first
+# submitted job (or by a service warmup). Each Uvicorn worker gets its
+# share of the cores, less one for its event loop, and every service
+# submits to this one pool so the budget holds.
+PROCESS_POOL_WORKERS = max(1, (os.cpu_count() or 2) // int(os.environ.get('WEB_CONCURRENCY', 1)) - 1)
+
+
+def _init_worker() -> None:
+    """
+    Cap the worker's address space at PROCESS_WORKER_MEMORY_LIMIT, so an
+    oversized decode fails with MemoryError inside its own job instead of
+    drawing the OOM killer. The pool already spreads jobs over the cores,
+    so the native libraries, if installed, run single-threaded rather than
+    oversubscribe them: OpenCV (with its SIMD/IPP kernels kept enabled) and
+    Numba's parallel kernels, which default to a thread per CPU.
+    """
+    if settings.PROCESS_WORKER_MEMORY_LIMIT:
+        import resource
+        limit = settings.PROCESS_WORKER_MEMORY_LIMIT
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    try:
+        import cv2
+    except ImportError:
+        pass
+    else:
+        cv2.setUseOptimized(True)
+        cv2.setNumThreads(1)
+
+    try:
+        import numba
+    except ImportError:
+        pass
+    else:
+        numba.set_num_threads(1)
+
+
+def _new_pool() -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=PROCESS_POOL_WORKERS, initializer=_init_worker)
+
+
+_pool = _new_pool()
+
+
+def submit(func, *args) -> Future:
+    """
+    Submit func(*args) to the shared pool
+    """
+    return _pool.submit(func, *args)
+
+
+async def run_in_process(func, *args):
+    """
+    Run func(*args) in the shared pool and return its result. A worker
+    killed outright (the OOM killer, a segfault in a native decoder) breaks
+    the whole executor; it is then replaced and the job retried once.
+    """
+    global _pool
+    pool = _pool
+    try:
+        return await asyncio.wrap_future(pool.submit(func, *args))
+    except BrokenProcessPool:
+        # Jobs that failed together replace the pool only once
+        if _pool is pool:
+            logger.warning("A process pool worker died; starting a new pool")
+            _pool = _new_pool()
+            pool.shutdown(wait=False)
+    return await asyncio.wrap_future(_pool.submit(func, *args))
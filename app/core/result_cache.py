@@ -0,0 +1,66 @@
+"""
+Reusing earlier results for byte-identical uploads
+"""
+
+import asyncio
+import os
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+# Most recent results remembered per worker process
+RESULT_CACHE_SIZE = 256
+
+# cache key -> output path of the run that produced it
+_results: "OrderedDict[str, str]" = OrderedDict()
+
+
+def result_key(operation: str, digest: str, *params) -> str:
+    """
+    Cache key for running operation with params on an upload whose
+    SHA-256 hex digest is digest
+    """
+    return ":".join([operation, digest, *map(str, params)])
+
+
+def _remember_result(key: str, output_path: str) -> None:
+    """
+    Remember output_path as the result for key, dropping the oldest entry
+    once the cache is full
+    """
+    _results[key] = output_path
+    _results.move_to_end(key)
+    while len(_results) > RESULT_CACHE_SIZE:
+        _results.popitem(last=False)
+
+
+async def run_cached(
+    key: str,
+    input_path: str,
+    output_path: str,
+    convert: Callable[[], Awaitable[bool]]
+) -> bool:
+    """
+    Produce output_path with convert(), unless an earlier run under key is
+    still on disk, in which case its output is linked in instead and the
+    input removed without being processed. Returns convert()'s result.
+    """
+    cached_path = _results.get(key)
+    if cached_path is not None:
+        try:
+            await asyncio.to_thread(os.link, cached_path, output_path)
+        except OSError:
+            # Cleaned up since, or already replaced
+            _results.pop(key, None)
+        else:
+            if key in _results:
+                _results.move_to_end(key)
+            try:
+                await asyncio.to_thread(os.remove, input_path)
+            except FileNotFoundError:
+                pass
+            return True
+
+    success = await convert()
+    if success:
+        _remember_result(key, output_path)
+    return success
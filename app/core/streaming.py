@@ -0,0 +1,25 @@
+"""
+Helpers for streamed responses
+"""
+
+from typing import AsyncIterator
+
+
+async def _replay(first: bytes, stream: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    yield first
+    async for chunk in stream:
+        yield chunk
+
+
+async def primed(stream: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Pull the first chunk of stream before any response is sent, so an input
+    that can't be processed raises here, while an error status can still
+    be returned, instead of ending a 200 response early; returns an
+    iterator over the whole stream
+    """
+    try:
+        first = await stream.__anext__()
+    except StopAsyncIteration:
+        return stream
+    return _replay(first, stream)
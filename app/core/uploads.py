@@ -0,0 +1,155 @@
+"""
+Writing uploaded files to disk
+"""
+
+import asyncio
+import contextlib
+import os
+import re
+import uuid
+from functools import lru_cache
+from typing import Any, List, Optional
+
+import aiofiles
+from fastapi import HTTPException, UploadFile
+
+# Uploads are copied to disk 1 MiB at a time
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Bounds the files held open by concurrent saves across all requests
+MAX_CONCURRENT_SAVES = 8
+_save_slots = asyncio.Semaphore(MAX_CONCURRENT_SAVES)
+
+# Bytes read from the front of an upload to identify its type
+SNIFF_SIZE = 1024
+
+
+async def read_head(file: UploadFile, size: int = SNIFF_SIZE) -> bytes:
+    """
+    First bytes of an upload, leaving it rewound for saving
+    """
+    head = await file.read(size)
+    await file.seek(0)
+    return head
+
+
+# Extensions kept from client filenames; anything else is dropped
+_SAFE_EXTENSION = re.compile(r"\.[a-z0-9]{1,10}")
+
+
+def upload_path(directory: str, filename: Optional[str], file_id: Optional[str] = None) -> str:
+    """
+    Disk path for an upload: a fresh UUID (or file_id) plus the client's
+    extension, lower-cased. The rest of the client's name is left out, so
+    path separators, traversal and overlong or odd names never reach the
+    filesystem; the original name stays available on the UploadFile.
+    """
+    extension = os.path.splitext(os.path.basename(filename or ""))[1].lower()
+    if not _SAFE_EXTENSION.fullmatch(extension):
+        extension = ""
+    return os.path.join(directory, f"{file_id or uuid.uuid4()}{extension}")
+
+
+# Linux can create a file with no name and link it into place afterwards;
+# the link goes through /proc, so both must be available
+UNNAMED_UPLOADS = hasattr(os, "O_TMPFILE") and os.path.isdir("/proc/self/fd")
+
+
+@lru_cache(maxsize=None)
+def _unnamed_supported(directory: str) -> bool:
+    """
+    Whether an unnamed file can be created in directory and linked into it;
+    some filesystems (and sandboxes) refuse one step or the other. Probed
+    once per directory.
+    """
+    if not UNNAMED_UPLOADS:
+        return False
+
+    probe_path = os.path.join(directory, f".probe_{uuid.uuid4().hex}")
+    try:
+        fd = os.open(directory, os.O_TMPFILE | os.O_WRONLY, 0o666)
+    except OSError:
+        return False
+    try:
+        os.link(f"/proc/self/fd/{fd}", probe_path)
+    except OSError:
+        return False
+    finally:
+        os.close(fd)
+    os.remove(probe_path)
+    return True
+
+
+def _open_unnamed(directory: str) -> Optional[int]:
+    """
+    Open an anonymous file in directory, or None when that isn't supported
+    """
+    if not _unnamed_supported(os.path.abspath(directory)):
+        return None
+    return os.open(directory, os.O_TMPFILE | os.O_WRONLY, 0o666)
+
+
+async def save_upload_file(
+    file: UploadFile,
+    destination: str,
+    max_size: Optional[int] = None,
+    digest: Optional[Any] = None
+) -> int:
+    """
+    Stream an uploaded file to disk in chunks without blocking the event
+    loop or holding the whole upload in memory; returns the bytes written.
+    Where the OS allows, the data goes into an unnamed file that is linked
+    at destination only once complete, so an interrupted or rejected upload
+    leaves nothing behind. Raises HTTPException(413) above max_size.
+    A hashlib digest, if given, is fed every chunk as it is written.
+    """
+    size = 0
+    too_large = False
+
+    async with _save_slots:
+        # The first save into a directory probes it on disk
+        fd = await asyncio.to_thread(_open_unnamed, os.path.dirname(destination) or ".")
+        async with aiofiles.open(destination if fd is None else fd, "wb") as buffer:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if max_size is not None and size > max_size:
+                    too_large = True
+                    break
+                if digest is None:
+                    await buffer.write(chunk)
+                else:
+                    # hashlib releases the GIL on large buffers, so the hash
+                    # runs in its own thread alongside the write
+                    await asyncio.gather(buffer.write(chunk), asyncio.to_thread(digest.update, chunk))
+
+            if fd is not None and not too_large:
+                await buffer.flush()
+                await asyncio.to_thread(os.link, f"/proc/self/fd/{fd}", destination)
+
+    if too_large:
+        if fd is None:
+            await remove_upload(destination)
+        raise HTTPException(
+            status_code=413,
+            detail=f"File size exceeds maximum allowed size of {max_size / (1024*1024):.1f}MB"
+        )
+
+    return size
+
+
+async def save_upload_files(files: List[UploadFile], directory: str) -> List[str]:
+    """
+    Save several uploads side by side, each under a unique name in
+    directory; returns their paths in upload order
+    """
+    paths = [upload_path(directory, file.filename) for file in files]
+    await asyncio.gather(*[save_upload_file(file, path) for file, path in zip(files, paths)])
+    return paths
+
+
+async def remove_upload(path: str) -> None:
+    """
+    Remove a saved upload off the event loop, ignoring it if already gone
+    """
+    with contextlib.suppress(FileNotFoundError):
+        await asyncio.to_thread(os.remove, path)
@@ -5,10 +5,17 @@ Main FastAPI application for Zenetia Zap converter service
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from starlette.datastructures import MutableHeaders
+import asyncio
+import os
 import time
 import uvicorn
 
 from app.api.v1.api import api_router
+from app.api.v1.endpoints.audio import audio_service
+from app.api.v1.endpoints.image import image_service
+from app.api.v1.endpoints.pdf import pdf_service
+from app.api.v1.endpoints.video import video_service
 from app.core.config import settings
 
 # Create FastAPI app instance
@@ -29,18 +36,54 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Request timing middleware
-@app.middleware("http")
-async def add_process_time_header(request: Request, call_next):
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    response.headers["X-Process-Time"] = str(process_time)
-    return response
+# Request timing middleware. Plain ASGI rather than @app.middleware("http"),
+# which re-streams every response body through an in-memory channel and so
+# keeps file downloads off the server's sendfile path.
+class ProcessTimeMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.time()
+
+        async def send_with_process_time(message):
+            if message["type"] == "http.response.start":
+                process_time = time.time() - start_time
+                MutableHeaders(scope=message)["X-Process-Time"] = str(process_time)
+            await send(message)
+
+        await self.app(scope, receive, send_with_process_time)
+
+app.add_middleware(ProcessTimeMiddleware)
 
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
 
+# Warm up processing libraries in the background so the first request
+# doesn't pay for codec loading, JIT compilation, encoder probing or
+# worker start-up. A warmup that fails only leaves its first request cold.
+@app.on_event("startup")
+async def warm_up_services():
+    app.state.warmup = asyncio.gather(
+        image_service.warmup(),
+        pdf_service.warmup(),
+        audio_service.warmup(),
+        video_service.warmup(),
+        return_exceptions=True
+    )
+
+# Stop a warmup still running and release cached watermark renderings on
+# shutdown
+@app.on_event("shutdown")
+async def release_service_caches():
+    app.state.warmup.cancel()
+    await asyncio.gather(app.state.warmup, return_exceptions=True)
+    pdf_service.clear_cache()
+
 # Health check endpoint
 @app.get("/")
 async def root():
@@ -63,9 +106,15 @@ async def global_exception_handler(request: Request, exc: Exception):
     )
 
 if __name__ == "__main__":
+    # Auto-reload watches the source tree and forces a single worker, so it
+    # is only used while developing
+    workers = 1 if settings.DEBUG else settings.WORKERS
+    # Worker processes read this to divide the cores between their pools
+    os.environ["WEB_CONCURRENCY"] = str(workers)
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True
+        reload=settings.DEBUG,
+        workers=workers
     ) 
\ No newline at end of file
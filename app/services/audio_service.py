@@ -4,7 +4,8 @@ Audio processing service
 
 import os
 import asyncio
-from typing import List, Optional
+import contextlib
+from typing import AsyncIterator, List, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,11 +21,53 @@ except ImportError as e:
     AudioSegment = None
     normalize = None
 
+from app.services.ffmpeg_utils import (
+    FFMPEG_AVAILABLE, FFMPEG_BINARY, FFmpegError, can_copy_audio, concat_copy, detect_aac_encoder, forget_file,
+    measure_peak, probe_duration, probe_streams, run_ffmpeg, stream_ffmpeg
+)
+
+# Point pydub at the binary resolved once at import instead of its own PATH
+# lookup, which misses the imageio-ffmpeg copy
+if AUDIO_AVAILABLE and FFMPEG_AVAILABLE:
+    AudioSegment.converter = FFMPEG_BINARY
+
+# Outputs whose container holds AAC audio
+AAC_EXTENSIONS = ('.m4a', '.aac', '.mp4')
+
+# Codecs whose packets each decode on their own, so trim_audio can cut them
+# without re-encoding; the cut lands on a packet edge (~26 ms for MP3,
+# ~23 ms for AAC, exact for PCM)
+TRIM_COPY_CODECS = ('mp3', 'aac', 'pcm_')
+
+# Formats convert_audio_stream can pipe: ffmpeg muxer, media type and any
+# muxer options needed to write without seeking back (MP4 normally puts its
+# index at the end, so it is fragmented instead)
+STREAM_FORMATS = {
+    "mp3": ("mp3", "audio/mpeg", []),
+    "wav": ("wav", "audio/wav", []),
+    "flac": ("flac", "audio/flac", []),
+    "aac": ("adts", "audio/aac", []),
+    "ogg": ("ogg", "audio/ogg", []),
+    "m4a": ("ipod", "audio/mp4", ["-movflags", "frag_keyframe+empty_moov"]),
+}
+
+# Peak level normalize_audio leaves below full scale, as pydub's normalize()
+NORMALIZE_HEADROOM_DB = 0.1
+
 class AudioService:
     """Service for audio processing operations"""
     
     def __init__(self):
         self.audio_available = AUDIO_AVAILABLE
+        # Resolved on first AAC output, then reused without another thread hop
+        self._aac_codec_args: Optional[List[str]] = None
+    
+    async def warmup(self) -> None:
+        """
+        Probe ffmpeg's encoders before the first request rather than during it
+        """
+        if FFMPEG_AVAILABLE:
+            await self._codec_args("warmup.m4a")
     
     async def convert_audio(
         self, 
@@ -37,30 +80,36 @@ class AudioService:
         """
         Convert audio file to different format
         """
-        if not self.audio_available:
+        if not (FFMPEG_AVAILABLE or self.audio_available):
             logger.error("Audio processing not available")
             return False
             
         try:
-            # Load audio file
-            audio = AudioSegment.from_file(input_path)
-            
-            # Apply sample rate if specified
-            if sample_rate:
-                audio = audio.set_frame_rate(sample_rate)
-            
-            # Export parameters
-            export_params = {"format": target_format}
-            
-            if bitrate:
-                export_params["bitrate"] = f"{bitrate}k"
-            
-            # Export audio
-            audio.export(output_path, **export_params)
+            if FFMPEG_AVAILABLE:
+                # A codec the target container already takes is just remuxed.
+                # Otherwise decode straight into the encoder; pydub would
+                # round-trip the samples through a temporary WAV and Python first
+                if bitrate or sample_rate or not await self._copy_audio(input_path, output_path):
+                    await self.process_audio(input_path, output_path, bitrate=bitrate, sample_rate=sample_rate)
+            else:
+                # Decode and encode off the event loop; pydub shells out to ffmpeg
+                audio = await asyncio.to_thread(AudioSegment.from_file, input_path)
+                
+                # Apply sample rate if specified
+                if sample_rate:
+                    audio = audio.set_frame_rate(sample_rate)
+                
+                # Export parameters
+                export_params = {"format": target_format}
+                
+                if bitrate:
+                    export_params["bitrate"] = f"{bitrate}k"
+                
+                # Export audio
+                await asyncio.to_thread(audio.export, output_path, **export_params)
             
             # Clean up input file
-            if os.path.exists(input_path):
-                os.remove(input_path)
+            await self._unlink(input_path)
             
             return True
             
@@ -68,6 +117,88 @@ class AudioService:
             logger.error(f"Error converting audio: {str(e)}")
             return False
     
+    async def convert_audio_stream(
+        self,
+        input_path: str,
+        target_format: str,
+        bitrate: Optional[int] = None,
+        sample_rate: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Convert audio and yield the encoded bytes as ffmpeg produces them,
+        without writing the output to disk. Removes the input when done.
+        """
+        muxer, _, muxer_args = STREAM_FORMATS[target_format]
+        output_args = ['-vn', *await self._codec_args(f".{target_format}")]
+        if sample_rate:
+            output_args += ['-ar', str(sample_rate)]
+        if bitrate:
+            output_args += ['-b:a', f"{bitrate}k"]
+        
+        try:
+            async for chunk in stream_ffmpeg('-i', input_path, *output_args, *muxer_args, '-f', muxer, '-'):
+                yield chunk
+        finally:
+            await self._unlink(input_path)
+    
+    async def process_audio(
+        self,
+        input_path: str,
+        output_path: str,
+        *,
+        trim: Optional[Tuple[float, Optional[float]]] = None,
+        volume: Optional[float] = None,
+        fade: Optional[Tuple[float, float]] = None,
+        fmt: Optional[str] = None,
+        bitrate: Optional[int] = None,
+        sample_rate: Optional[int] = None
+    ) -> None:
+        """
+        Trim, adjust volume (dB) and fade in/out in a single ffmpeg run with
+        one filter chain, so chained edits decode and encode only once.
+        bitrate (kbps) and sample_rate set the output encoding.
+        Leaves the input in place; raises FFmpegError on failure.
+        """
+        input_args = []
+        filters = []
+        length = None
+        
+        if trim:
+            start_time, end_time = trim
+            # Input-side seek skips decoding everything before the cut
+            input_args += ['-ss', str(start_time)]
+            if end_time:
+                length = max(end_time - start_time, 0)
+                input_args += ['-t', str(length)]
+        
+        if volume:
+            filters.append(f"volume={volume}dB")
+        
+        if fade:
+            fade_in, fade_out = fade
+            if fade_in:
+                filters.append(f"afade=t=in:st=0:d={fade_in}")
+            if fade_out:
+                # afade needs an absolute start, so find where the output ends
+                if length is None:
+                    duration = await probe_duration(input_path)
+                    if duration is None:
+                        raise FFmpegError(f"Could not determine duration of {input_path}")
+                    length = max(duration - (trim[0] if trim else 0), 0)
+                filters.append(f"afade=t=out:st={max(length - fade_out, 0)}:d={fade_out}")
+        
+        output_args = ['-vn', *await self._codec_args(output_path)]
+        if filters:
+            output_args += ['-af', ",".join(filters)]
+        if sample_rate:
+            output_args += ['-ar', str(sample_rate)]
+        if bitrate:
+            output_args += ['-b:a', f"{bitrate}k"]
+        if fmt:
+            output_args += ['-f', fmt]
+        
+        await run_ffmpeg(*input_args, '-i', input_path, *output_args, output_path)
+    
     async def trim_audio(
         self, 
         input_path: str, 
@@ -78,27 +209,31 @@ class AudioService:
         """
         Trim audio file to specified time range
         """
-        if not self.audio_available:
+        if not (FFMPEG_AVAILABLE or self.audio_available):
             logger.error("Audio processing not available")
             return False
             
         try:
-            # Load audio file
-            audio = AudioSegment.from_file(input_path)
-            
-            # Convert time to milliseconds
-            start_ms = int(start_time * 1000)
-            end_ms = int(end_time * 1000) if end_time else len(audio)
-            
-            # Trim audio
-            trimmed_audio = audio[start_ms:end_ms]
-            
-            # Export trimmed audio
-            trimmed_audio.export(output_path, format=self._get_format_from_path(output_path))
+            if FFMPEG_AVAILABLE:
+                # Re-encode only when the stream can't simply be cut
+                if not await self._trim_copy(input_path, output_path, start_time, end_time):
+                    await self.process_audio(input_path, output_path, trim=(start_time, end_time))
+            else:
+                # Load audio file
+                audio = await asyncio.to_thread(AudioSegment.from_file, input_path)
+                
+                # Convert time to milliseconds
+                start_ms = int(start_time * 1000)
+                end_ms = int(end_time * 1000) if end_time else len(audio)
+                
+                # Trim audio
+                trimmed_audio = audio[start_ms:end_ms]
+                
+                # Export trimmed audio
+                await asyncio.to_thread(trimmed_audio.export, output_path, format=self._get_format_from_path(output_path))
             
             # Clean up input file
-            if os.path.exists(input_path):
-                os.remove(input_path)
+            await self._unlink(input_path)
             
             return True
             
@@ -106,11 +241,51 @@ class AudioService:
             logger.error(f"Error trimming audio: {str(e)}")
             return False
     
+    async def _trim_copy(
+        self,
+        input_path: str,
+        output_path: str,
+        start_time: float,
+        end_time: Optional[float]
+    ) -> bool:
+        """
+        Cut the audio stream without decoding it when its codec allows and
+        the output container takes it; False means a re-encode is needed
+        """
+        args = ['-ss', str(start_time)]
+        if end_time:
+            args += ['-t', str(max(end_time - start_time, 0))]
+        
+        return await self._copy_audio(input_path, output_path, args, TRIM_COPY_CODECS)
+    
+    async def _copy_audio(
+        self,
+        input_path: str,
+        output_path: str,
+        input_args: Optional[List[str]] = None,
+        codecs: Optional[Tuple[str, ...]] = None
+    ) -> bool:
+        """
+        Stream-copy the first audio stream into output_path if the output
+        container takes its codec (and, when codecs is given, the codec name
+        starts with one of them); False means a re-encode is needed
+        """
+        codec = next((stream["codec"] for stream in await probe_streams(input_path) if stream["type"] == "audio"), None)
+        if not (codec and (codecs is None or codec.startswith(codecs)) and can_copy_audio(codec, output_path)):
+            return False
+        
+        try:
+            await run_ffmpeg(*(input_args or []), '-i', input_path, '-map', '0:a:0', '-c:a', 'copy', output_path)
+        except FFmpegError as e:
+            logger.warning(f"Audio stream copy failed, re-encoding: {str(e)}")
+            return False
+        return True
+    
     async def merge_audio(self, input_paths: List[str], output_path: str) -> bool:
         """
         Merge multiple audio files into one
         """
-        if not self.audio_available:
+        if not (FFMPEG_AVAILABLE or self.audio_available):
             logger.error("Audio processing not available")
             return False
             
@@ -118,21 +293,52 @@ class AudioService:
             if not input_paths:
                 return False
             
-            # Load first audio file
-            combined = AudioSegment.from_file(input_paths[0])
-            
-            # Append other audio files
-            for audio_path in input_paths[1:]:
-                audio = AudioSegment.from_file(audio_path)
-                combined += audio
-            
-            # Export merged audio
-            combined.export(output_path, format=self._get_format_from_path(output_path))
+            if FFMPEG_AVAILABLE:
+                streams = await asyncio.gather(*[probe_streams(audio_path) for audio_path in input_paths])
+                audio_streams = [s for clip in streams for s in clip if s["type"] == "audio"]
+                
+                if (
+                    len(audio_streams) == len(input_paths)
+                    and all(clip == streams[0] for clip in streams)
+                    and can_copy_audio(audio_streams[0]["codec"], output_path)
+                ):
+                    # Identical streams the output container accepts are joined
+                    # packet by packet without decoding
+                    await concat_copy(input_paths, output_path)
+                else:
+                    # One ffmpeg process decodes every input, joins them in a single
+                    # concat filter graph and encodes once; no Python-side samples.
+                    # concat negotiates the narrowest common format; keep the
+                    # highest sample rate and stereo if any input has it, as pydub does
+                    sample_rate = max((int(s["sample_rate"]) for s in audio_streams if s["sample_rate"]), default=44100)
+                    layout = "mono" if all(s["channels"] == "mono" for s in audio_streams) else "stereo"
+                    
+                    inputs = [arg for audio_path in input_paths for arg in ('-i', audio_path)]
+                    pads = "".join(f"[{index}:a:0]" for index in range(len(input_paths)))
+                    await run_ffmpeg(
+                        '-filter_complex_threads', str(os.cpu_count() or 1),
+                        *inputs,
+                        '-filter_complex',
+                        f"{pads}concat=n={len(input_paths)}:v=0:a=1,"
+                        f"aformat=sample_rates={sample_rate}:channel_layouts={layout}[out]",
+                        '-map', '[out]',
+                        *await self._codec_args(output_path),
+                        output_path
+                    )
+            else:
+                # Load first audio file
+                combined = await asyncio.to_thread(AudioSegment.from_file, input_paths[0])
+                
+                # Append other audio files
+                for audio_path in input_paths[1:]:
+                    audio = await asyncio.to_thread(AudioSegment.from_file, audio_path)
+                    combined += audio
+                
+                # Export merged audio
+                await asyncio.to_thread(combined.export, output_path, format=self._get_format_from_path(output_path))
             
             # Clean up input files
-            for audio_path in input_paths:
-                if os.path.exists(audio_path):
-                    os.remove(audio_path)
+            await asyncio.gather(*[self._unlink(audio_path) for audio_path in input_paths])
             
             return True
             
@@ -144,23 +350,25 @@ class AudioService:
         """
         Adjust volume of audio file (volume_change in dB)
         """
-        if not self.audio_available:
+        if not (FFMPEG_AVAILABLE or self.audio_available):
             logger.error("Audio processing not available")
             return False
             
         try:
-            # Load audio file
-            audio = AudioSegment.from_file(input_path)
-            
-            # Adjust volume
-            adjusted_audio = audio + volume_change
-            
-            # Export adjusted audio
-            adjusted_audio.export(output_path, format=self._get_format_from_path(output_path))
+            if FFMPEG_AVAILABLE:
+                await self.process_audio(input_path, output_path, volume=volume_change)
+            else:
+                # Load audio file
+                audio = await asyncio.to_thread(AudioSegment.from_file, input_path)
+                
+                # Adjust volume
+                adjusted_audio = audio + volume_change
+                
+                # Export adjusted audio
+                await asyncio.to_thread(adjusted_audio.export, output_path, format=self._get_format_from_path(output_path))
             
             # Clean up input file
-            if os.path.exists(input_path):
-                os.remove(input_path)
+            await self._unlink(input_path)
             
             return True
             
@@ -172,23 +380,29 @@ class AudioService:
         """
         Normalize audio levels
         """
-        if not self.audio_available:
+        if not (FFMPEG_AVAILABLE or self.audio_available):
             logger.error("Audio processing not available")
             return False
             
         try:
-            # Load audio file
-            audio = AudioSegment.from_file(input_path)
-            
-            # Normalize audio
-            normalized_audio = normalize(audio)
-            
-            # Export normalized audio
-            normalized_audio.export(output_path, format=self._get_format_from_path(output_path))
+            if FFMPEG_AVAILABLE:
+                # Same peak normalization as pydub (0.1 dB headroom), measured
+                # and applied by ffmpeg without decoding into Python
+                peak = await measure_peak(input_path)
+                gain = -NORMALIZE_HEADROOM_DB - peak if peak is not None else None
+                await self.process_audio(input_path, output_path, volume=gain)
+            else:
+                # Load audio file
+                audio = await asyncio.to_thread(AudioSegment.from_file, input_path)
+                
+                # Normalize audio
+                normalized_audio = normalize(audio)
+                
+                # Export normalized audio
+                await asyncio.to_thread(normalized_audio.export, output_path, format=self._get_format_from_path(output_path))
             
             # Clean up input file
-            if os.path.exists(input_path):
-                os.remove(input_path)
+            await self._unlink(input_path)
             
             return True
             
@@ -206,27 +420,29 @@ class AudioService:
         """
         Add fade in/out effects to audio
         """
-        if not self.audio_available:
+        if not (FFMPEG_AVAILABLE or self.audio_available):
             logger.error("Audio processing not available")
             return False
             
         try:
-            # Load audio file
-            audio = AudioSegment.from_file(input_path)
-            
-            # Convert duration to milliseconds
-            fade_in_ms = int(fade_in_duration * 1000)
-            fade_out_ms = int(fade_out_duration * 1000)
-            
-            # Apply fade effects
-            audio_with_fade = audio.fade_in(fade_in_ms).fade_out(fade_out_ms)
-            
-            # Export audio with fades
-            audio_with_fade.export(output_path, format=self._get_format_from_path(output_path))
+            if FFMPEG_AVAILABLE:
+                await self.process_audio(input_path, output_path, fade=(fade_in_duration, fade_out_duration))
+            else:
+                # Load audio file
+                audio = await asyncio.to_thread(AudioSegment.from_file, input_path)
+                
+                # Convert duration to milliseconds
+                fade_in_ms = int(fade_in_duration * 1000)
+                fade_out_ms = int(fade_out_duration * 1000)
+                
+                # Apply fade effects
+                audio_with_fade = audio.fade_in(fade_in_ms).fade_out(fade_out_ms)
+                
+                # Export audio with fades
+                await asyncio.to_thread(audio_with_fade.export, output_path, format=self._get_format_from_path(output_path))
             
             # Clean up input file
-            if os.path.exists(input_path):
-                os.remove(input_path)
+            await self._unlink(input_path)
             
             return True
             
@@ -238,28 +454,40 @@ class AudioService:
         """
         Change playback speed of audio
         """
-        if not self.audio_available:
+        if not (FFMPEG_AVAILABLE or self.audio_available):
             logger.error("Audio processing not available")
             return False
             
         try:
-            # Load audio file
-            audio = AudioSegment.from_file(input_path)
-            
-            # Change speed by manipulating frame rate
-            # speed_factor > 1.0 = faster, < 1.0 = slower
-            new_sample_rate = int(audio.frame_rate * speed_factor)
-            
-            # Apply speed change
-            speed_changed = audio._spawn(audio.raw_data, overrides={"frame_rate": new_sample_rate})
-            speed_changed = speed_changed.set_frame_rate(audio.frame_rate)
-            
-            # Export speed-changed audio
-            speed_changed.export(output_path, format=self._get_format_from_path(output_path))
+            if FFMPEG_AVAILABLE:
+                # Reinterpret the samples at a scaled rate and resample back,
+                # matching the pydub path (pitch moves with speed)
+                streams = await probe_streams(input_path)
+                audio_stream = next((s for s in streams if s["type"] == "audio"), {})
+                frame_rate = int(audio_stream.get("sample_rate") or 44100)
+                await run_ffmpeg(
+                    '-i', input_path, '-vn',
+                    '-af', f"asetrate={int(frame_rate * speed_factor)},aresample={frame_rate}",
+                    *await self._codec_args(output_path),
+                    output_path
+                )
+            else:
+                # Load audio file
+                audio = await asyncio.to_thread(AudioSegment.from_file, input_path)
+                
+                # Change speed by manipulating frame rate
+                # speed_factor > 1.0 = faster, < 1.0 = slower
+                new_sample_rate = int(audio.frame_rate * speed_factor)
+                
+                # Apply speed change
+                speed_changed = audio._spawn(audio.raw_data, overrides={"frame_rate": new_sample_rate})
+                speed_changed = speed_changed.set_frame_rate(audio.frame_rate)
+                
+                # Export speed-changed audio
+                await asyncio.to_thread(speed_changed.export, output_path, format=self._get_format_from_path(output_path))
             
             # Clean up input file
-            if os.path.exists(input_path):
-                os.remove(input_path)
+            await self._unlink(input_path)
             
             return True
             
@@ -267,8 +495,27 @@ class AudioService:
             logger.error(f"Error changing audio speed: {str(e)}")
             return False
     
+    async def _codec_args(self, output_path: str) -> List[str]:
+        """
+        Encoder override for the output container; AAC outputs use the best
+        AAC encoder ffmpeg was built with, everything else its default
+        """
+        if os.path.splitext(output_path)[1].lower() not in AAC_EXTENSIONS:
+            return []
+        if self._aac_codec_args is None:
+            self._aac_codec_args = ['-c:a', await asyncio.to_thread(detect_aac_encoder)]
+        return self._aac_codec_args
+    
     def _get_format_from_path(self, file_path: str) -> str:
         """
         Extract format from file path
         """
-        return os.path.splitext(file_path)[1][1:].lower() 
\ No newline at end of file
+        return os.path.splitext(file_path)[1][1:].lower()
+    
+    async def _unlink(self, file_path: str) -> None:
+        """
+        Remove a file off the event loop, ignoring it if already gone
+        """
+        forget_file(file_path)
+        with contextlib.suppress(FileNotFoundError):
+            await asyncio.to_thread(os.remove, file_path) 
\ No newline at end of file
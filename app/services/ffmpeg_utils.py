@@ -0,0 +1,364 @@
+"""
+Shared ffmpeg helpers for the audio and video services
+"""
+
+import asyncio
+import glob
+import os
+import re
+import shutil
+import subprocess
+import uuid
+from collections import OrderedDict
+from functools import lru_cache
+from typing import AsyncIterator, List, Optional
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+def _find_ffmpeg() -> Optional[str]:
+    """
+    Locate an ffmpeg binary once per process without running it:
+    FFMPEG_PATH when configured, else the first on PATH, then the copy
+    bundled with imageio-ffmpeg
+    """
+    if settings.FFMPEG_PATH:
+        return settings.FFMPEG_PATH
+
+    binary = shutil.which("ffmpeg")
+    if binary:
+        return binary
+
+    try:
+        import imageio_ffmpeg
+    except ImportError as e:
+        logger.warning(f"ffmpeg not available: {str(e)}")
+        return None
+
+    # Take the wheel's bundled binary straight from disk; get_ffmpeg_exe()
+    # validates every candidate by running `ffmpeg -version`
+    bundled = glob.glob(os.path.join(os.path.dirname(imageio_ffmpeg.__file__), "binaries", "ffmpeg-*"))
+    for binary in bundled:
+        if os.access(binary, os.X_OK):
+            return binary
+
+    try:
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except RuntimeError as e:
+        logger.warning(f"ffmpeg not available: {str(e)}")
+        return None
+
+FFMPEG_BINARY = _find_ffmpeg()
+FFMPEG_AVAILABLE = FFMPEG_BINARY is not None
+
+# Each encode can saturate a core, so running more at once than there are
+# cores only adds contention; extra requests queue here instead
+_ffmpeg_slots = asyncio.Semaphore(os.cpu_count() or 1)
+
+# Small intermediates (pass logs, overlay images) go to tmpfs
+# when the host has one; bulky ones such as video segments stay in TEMP_DIR
+SCRATCH_DIR = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+
+def scratch_path(suffix: str) -> str:
+    """
+    Unique path for a small intermediate file, in RAM when possible
+    """
+    return os.path.join(SCRATCH_DIR or os.path.abspath(settings.TEMP_DIR), f"{uuid.uuid4().hex}{suffix}")
+
+# Fixed head of every encode command line, built once
+_RUN_PREFIX = (FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", "-y")
+
+class FFmpegError(RuntimeError):
+    """Raised when an ffmpeg invocation exits with an error"""
+
+async def run_ffmpeg(*args: str, stdin_data: Optional[bytes] = None) -> None:
+    """
+    Run ffmpeg with the given arguments without blocking the event loop;
+    stdin_data, if given, is fed to ffmpeg's stdin (read as "pipe:0")
+    """
+    async with _ffmpeg_slots:
+        process = await asyncio.create_subprocess_exec(
+            *_RUN_PREFIX, *args,
+            stdin=asyncio.subprocess.DEVNULL if stdin_data is None else asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        _, stderr = await process.communicate(stdin_data)
+
+    if process.returncode != 0:
+        raise FFmpegError(stderr.decode(errors="replace").strip() or f"ffmpeg exited with {process.returncode}")
+
+# Chunk size for reading an encode piped to stdout
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# A stream's ffmpeg runs at the pace of the client reading it, so streams
+# hold slots of their own; slow downloads never starve the encodes above
+MAX_CONCURRENT_STREAMS = os.cpu_count() or 1
+_stream_slots = asyncio.Semaphore(MAX_CONCURRENT_STREAMS)
+
+async def stream_ffmpeg(*args: str) -> AsyncIterator[bytes]:
+    """
+    Run ffmpeg writing its output to stdout (args should end with "-") and
+    yield it as it is encoded. The process is killed if the consumer stops
+    early; raises FFmpegError if ffmpeg fails.
+    """
+    async with _stream_slots:
+        process = await asyncio.create_subprocess_exec(
+            *_RUN_PREFIX, *args,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        # Drain stderr alongside stdout so a full pipe can't stall ffmpeg
+        stderr_task = asyncio.create_task(process.stderr.read())
+        try:
+            while chunk := await process.stdout.read(STREAM_CHUNK_SIZE):
+                yield chunk
+            await process.wait()
+        finally:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            stderr = await stderr_task
+
+    if process.returncode != 0:
+        raise FFmpegError(stderr.decode(errors="replace").strip() or f"ffmpeg exited with {process.returncode}")
+
+_DURATION_PATTERN = re.compile(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+_STREAM_PATTERN = re.compile(r"Stream #0:\d+.*?: (Video|Audio): (\w+)(.*)")
+_SIZE_PATTERN = re.compile(r", (\d{2,})x(\d{2,})")
+_FPS_PATTERN = re.compile(r", ([\d.]+) fps")
+_PIX_FMT_PATTERN = re.compile(r", ((?:yuv|yuvj|rgb|bgr|gray|nv)\w*)")
+_AUDIO_PATTERN = re.compile(r", (\d+) Hz, ([\w.()]+)")
+
+# Banners keyed by absolute path and validated against mtime/size, so the
+# duration and stream probes a single request makes on the same file spawn
+# ffmpeg once. Entries are dropped when the services delete the file.
+# Only touched from the event loop, so no lock is needed.
+BANNER_CACHE_SIZE = 32
+_banner_cache: "OrderedDict[str, tuple]" = OrderedDict()
+
+def forget_file(file_path: str) -> None:
+    """
+    Drop cached probe results for a file that is about to be deleted
+    """
+    _banner_cache.pop(os.path.abspath(file_path), None)
+
+async def _read_banner(file_path: str) -> str:
+    """
+    Return the input description ffmpeg prints for a media file
+    """
+    stat = os.stat(file_path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cache_key = os.path.abspath(file_path)
+
+    entry = _banner_cache.get(cache_key)
+    if entry is not None and entry[0] == key:
+        _banner_cache.move_to_end(cache_key)
+        return entry[1]
+
+    process = await asyncio.create_subprocess_exec(
+        FFMPEG_BINARY, "-hide_banner", "-i", file_path,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE
+    )
+    # ffmpeg exits non-zero without an output file; only the banner matters
+    _, stderr = await process.communicate()
+    banner = stderr.decode(errors="replace")
+
+    _banner_cache[cache_key] = (key, banner)
+    _banner_cache.move_to_end(cache_key)
+    while len(_banner_cache) > BANNER_CACHE_SIZE:
+        _banner_cache.popitem(last=False)
+
+    return banner
+
+async def probe_duration(file_path: str) -> Optional[float]:
+    """
+    Read a media file's duration in seconds from ffmpeg's input banner,
+    or None when the container doesn't declare one
+    """
+    match = _DURATION_PATTERN.search(await _read_banner(file_path))
+    if not match:
+        return None
+
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+async def probe_streams(file_path: str) -> List[dict]:
+    """
+    Describe the first video and audio streams of a media file: codec plus
+    width/height/fps/pixel format for video and sample rate/channel layout
+    for audio
+    """
+    streams = []
+    seen = set()
+
+    for line in (await _read_banner(file_path)).splitlines():
+        match = _STREAM_PATTERN.search(line)
+        if not match or match.group(1) in seen:
+            continue
+
+        kind, codec, details = match.groups()
+        seen.add(kind)
+        stream = {"type": kind.lower(), "codec": codec}
+
+        if kind == "Video":
+            size = _SIZE_PATTERN.search(details)
+            fps = _FPS_PATTERN.search(details)
+            stream["width"], stream["height"] = (int(size.group(1)), int(size.group(2))) if size else (None, None)
+            stream["fps"] = fps.group(1) if fps else None
+            pix_fmt = _PIX_FMT_PATTERN.search(details)
+            stream["pix_fmt"] = pix_fmt.group(1) if pix_fmt else None
+        else:
+            audio = _AUDIO_PATTERN.search(details)
+            stream["sample_rate"], stream["channels"] = audio.groups() if audio else (None, None)
+
+        streams.append(stream)
+
+    return streams
+
+# Audio codecs each output container can take without re-encoding;
+# Matroska takes anything
+COPYABLE_AUDIO = {
+    '.mp4': {'aac', 'mp3', 'ac3', 'eac3', 'alac'},
+    '.mov': {'aac', 'mp3', 'ac3', 'eac3', 'alac', 'pcm_s16le'},
+    '.m4v': {'aac', 'mp3', 'ac3', 'eac3'},
+    '.m4a': {'aac', 'alac'},
+    '.webm': {'opus', 'vorbis'},
+    '.mp3': {'mp3'},
+    '.aac': {'aac'},
+    '.ogg': {'vorbis', 'opus', 'flac'},
+    '.opus': {'opus'},
+    '.flac': {'flac'},
+    '.wav': {'pcm_s16le', 'pcm_s24le', 'pcm_s32le', 'pcm_f32le', 'pcm_u8'},
+}
+
+def can_copy_audio(codec: Optional[str], output_path: str) -> bool:
+    """
+    Whether an audio stream in codec can be stream-copied into output_path
+    """
+    extension = os.path.splitext(output_path)[1].lower()
+    if extension in ('.mkv', '.mka'):
+        return codec is not None
+    return codec in COPYABLE_AUDIO.get(extension, ())
+
+# Reads a concat demuxer list piped to stdin, so no list file is written
+CONCAT_LIST_INPUT = ('-f', 'concat', '-safe', '0', '-protocol_whitelist', 'file,pipe', '-i', 'pipe:0')
+
+def concat_list(input_paths: List[str]) -> bytes:
+    """
+    Concat demuxer list naming each file by absolute path; the file:
+    prefix stops entries resolving relative to the list's pipe: URL
+    """
+    lines = []
+    for path in input_paths:
+        # Paths are generated (UUID names under our own directories); the
+        # escaping only guards the list syntax if that ever changes
+        escaped = os.path.abspath(path).replace("'", "'\\''")
+        lines.append(f"file 'file:{escaped}'\n")
+    return "".join(lines).encode()
+
+async def concat_copy(input_paths: List[str], output_path: str) -> None:
+    """
+    Join files with identical streams using the concat demuxer, no decoding
+    """
+    await run_ffmpeg(
+        *CONCAT_LIST_INPUT, '-map', '0', '-c', 'copy', output_path, stdin_data=concat_list(input_paths)
+    )
+
+_MAX_VOLUME_PATTERN = re.compile(r"max_volume: (-?[\d.]+) dB")
+
+async def measure_peak(file_path: str) -> Optional[float]:
+    """
+    Peak level of a file's first audio stream in dBFS, or None for silence
+    """
+    async with _ffmpeg_slots:
+        process = await asyncio.create_subprocess_exec(
+            FFMPEG_BINARY, "-hide_banner", "-nostats", "-i", file_path,
+            "-map", "0:a:0", "-af", "volumedetect", "-f", "null", "-",
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        _, stderr = await process.communicate()
+
+    output = stderr.decode(errors="replace")
+    if process.returncode != 0:
+        raise FFmpegError(output.strip() or f"ffmpeg exited with {process.returncode}")
+
+    match = _MAX_VOLUME_PATTERN.search(output)
+    return float(match.group(1)) if match else None
+
+# Hardware H.264 encoders in order of preference. VAAPI is left out: it needs
+# an explicit device and hwupload filter graph that software filters can't share.
+_HW_H264_ENCODERS = ("h264_nvenc", "h264_qsv", "h264_videotoolbox")
+
+@lru_cache(maxsize=1)
+def _list_encoders() -> str:
+    """
+    ffmpeg's encoder listing, read once per process. Blocking.
+    """
+    if not FFMPEG_AVAILABLE:
+        return ""
+
+    try:
+        return subprocess.run(
+            [FFMPEG_BINARY, "-hide_banner", "-encoders"], capture_output=True, text=True, timeout=10
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+@lru_cache(maxsize=1)
+def detect_hw_h264_encoder() -> Optional[str]:
+    """
+    Return the first hardware H.264 encoder that can actually open on this
+    machine, or None. Blocking; probed once per process.
+    """
+    listing = _list_encoders()
+    if not listing:
+        return None
+
+    for encoder in _HW_H264_ENCODERS:
+        if encoder not in listing:
+            continue
+
+        # Being compiled in doesn't mean the device is present; try a tiny encode
+        try:
+            probe = subprocess.run(
+                [
+                    FFMPEG_BINARY, "-hide_banner", "-loglevel", "error",
+                    "-f", "lavfi", "-i", "color=size=256x256:duration=0.1",
+                    "-c:v", encoder, "-f", "null", "-"
+                ],
+                capture_output=True,
+                timeout=30
+            )
+        except (OSError, subprocess.SubprocessError):
+            continue
+
+        if probe.returncode == 0:
+            logger.info(f"Using hardware H.264 encoder {encoder}")
+            return encoder
+
+    return None
+
+# AAC encoders preferred over ffmpeg's native one: Fraunhofer FDK, then the
+# platform encoders on macOS (AudioToolbox) and Windows (Media Foundation)
+_AAC_ENCODERS = ("libfdk_aac", "aac_at", "aac_mf")
+
+@lru_cache(maxsize=1)
+def detect_aac_encoder() -> str:
+    """
+    Best AAC encoder compiled into ffmpeg, falling back to the native "aac".
+    Blocking; probed once per process.
+    """
+    listing = _list_encoders()
+    for encoder in _AAC_ENCODERS:
+        if re.search(rf"\s{encoder}\s", listing):
+            logger.info(f"Using AAC encoder {encoder}")
+            return encoder
+    return "aac"
@@ -2,33 +2,73 @@
 Image processing service
 """
 
+import errno
+import io
 import os
+import math
+import shutil
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Optional
 import logging
 
+from app.core.config import settings
+from app.core.process_pool import PROCESS_POOL_WORKERS, run_in_process
+
 logger = logging.getLogger(__name__)
 
 # Try to import image processing libraries, handle gracefully if not available
 try:
-    from PIL import Image, ImageEnhance, ImageFilter
+    from PIL import Image, ImageDraw, ImageEnhance, ImageFilter, ImageFont, features
+    from PIL import __version__ as PIL_VERSION
     PIL_AVAILABLE = True
+    # Pillow-SIMD releases carry a ".postN" suffix on the Pillow version they track
+    PILLOW_SIMD = '.post' in PIL_VERSION
 except ImportError as e:
     logger.warning(f"PIL not available: {str(e)}")
     PIL_AVAILABLE = False
+    PIL_VERSION = None
+    PILLOW_SIMD = False
     Image = None
+    ImageDraw = None
     ImageEnhance = None
     ImageFilter = None
+    ImageFont = None
+    features = None
 
 try:
-    import cv2
     import numpy as np
-    CV2_AVAILABLE = True
+    NUMPY_AVAILABLE = True
+except ImportError as e:
+    logger.warning(f"NumPy not available: {str(e)}")
+    NUMPY_AVAILABLE = False
+    np = None
+
+try:
+    import cv2
+    CV2_AVAILABLE = NUMPY_AVAILABLE
 except ImportError as e:
     logger.warning(f"OpenCV not available: {str(e)}")
     CV2_AVAILABLE = False
     cv2 = None
-    np = None
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = NUMPY_AVAILABLE
+except ImportError as e:
+    logger.info(f"Numba not available, using NumPy enhance pipeline: {str(e)}")
+    NUMBA_AVAILABLE = False
+    njit = None
+    prange = None
+
+try:
+    import pyvips
+    VIPS_AVAILABLE = True
+except (ImportError, OSError) as e:
+    logger.info(f"pyvips not available, using PIL for resize/convert/compress: {str(e)}")
+    VIPS_AVAILABLE = False
+    pyvips = None
 
 try:
     from rembg import remove, new_session
@@ -39,30 +79,1044 @@ except ImportError as e:
     remove = None
     new_session = None
 
+# The rembg ONNX session cannot be pickled across process boundaries, but
+# ONNX Runtime releases the GIL during inference, so a thread pool suffices.
+_thread_pool = ThreadPoolExecutor(max_workers=max(1, (os.cpu_count() or 2) - 1))
+
+DEFAULT_CONVERT_QUALITY = 95
+
+# Encoder options for every JPEG we write: optimal Huffman tables (3-5%
+# smaller), progressive scans and 4:2:0 chroma subsampling
+JPEG_SAVE_OPTIONS = {'optimize': True, 'progressive': True, 'subsampling': 2}
+
+# libwebp effort level; 4 encodes ~2x faster than 6 at negligible size cost
+WEBP_SAVE_OPTIONS = {'method': 4}
+
+
+def _safe_unlink(path: str) -> None:
+    """
+    Remove a file, ignoring it if it is already gone
+    """
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _move_file(src: str, dst: str) -> None:
+    """
+    Move a file into place. A rename when both paths share a filesystem;
+    otherwise (e.g. TEMP_DIR on tmpfs) the data is copied in-kernel with
+    sendfile and the source removed.
+    """
+    try:
+        os.replace(src, dst)
+        return
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+
+    with open(src, 'rb') as src_file, open(dst, 'wb') as dst_file:
+        try:
+            remaining = os.fstat(src_file.fileno()).st_size
+            offset = 0
+            while remaining > 0:
+                sent = os.sendfile(dst_file.fileno(), src_file.fileno(), offset, remaining)
+                if sent == 0:
+                    break
+                offset += sent
+                remaining -= sent
+        except (AttributeError, OSError):
+            # No sendfile for this pair of files; copy with a large buffer
+            src_file.seek(0)
+            dst_file.seek(0)
+            dst_file.truncate()
+            shutil.copyfileobj(src_file, dst_file, 4 * 1024 * 1024)
+    shutil.copystat(src, dst)
+    os.unlink(src)
+
+
+def _normalize_format(ext: str) -> str:
+    """
+    Normalize a file extension or format name for comparison
+    """
+    ext = ext.lstrip('.').lower()
+    return 'jpg' if ext == 'jpeg' else ext
+
+
+def _same_format(input_path: str, output_path: str) -> bool:
+    """
+    Check whether input and output paths share the same image format
+    """
+    return _normalize_format(os.path.splitext(input_path)[1]) == \
+        _normalize_format(os.path.splitext(output_path)[1])
+
+
+# Output formats handled by the libvips fast path; anything else goes to PIL
+_VIPS_SAVE_FORMATS = {'jpg', 'png', 'webp', 'tif', 'tiff'}
+
+
+def _use_vips(output_path: str) -> bool:
+    """
+    Check whether the libvips pipeline can produce this output file
+    """
+    return VIPS_AVAILABLE and _normalize_format(os.path.splitext(output_path)[1]) in _VIPS_SAVE_FORMATS
+
+
+def _vips_save(image, output_path: str, quality: Optional[int] = None, optimize: bool = False) -> None:
+    """
+    Encode a (lazy) libvips image, mirroring the PIL save options used here
+    """
+    fmt = _normalize_format(os.path.splitext(output_path)[1])
+
+    save_kwargs = {'strip': True}
+    if fmt == 'jpg':
+        # JPEG has no alpha channel
+        if image.hasalpha():
+            image = image.flatten()
+        if quality is not None:
+            save_kwargs['Q'] = quality
+        save_kwargs['optimize_coding'] = optimize
+        save_kwargs['interlace'] = optimize
+    elif fmt == 'webp':
+        if quality is not None:
+            save_kwargs['Q'] = quality
+        save_kwargs['effort'] = WEBP_SAVE_OPTIONS['method']
+    elif fmt == 'png' and optimize:
+        save_kwargs['compression'] = 9
+
+    image.write_to_file(output_path, **save_kwargs)
+
+
+def _target_dimensions(
+    original_width: int,
+    original_height: int,
+    width: Optional[int],
+    height: Optional[int],
+    maintain_aspect_ratio: bool
+):
+    """
+    Compute the output size for resize_image
+    """
+    if maintain_aspect_ratio:
+        if width and not height:
+            # Calculate height based on width
+            ratio = width / original_width
+            height = int(original_height * ratio)
+        elif height and not width:
+            # Calculate width based on height
+            ratio = height / original_height
+            width = int(original_width * ratio)
+        elif width and height:
+            # Use the smaller ratio to fit within bounds
+            ratio = min(width / original_width, height / original_height)
+            width = int(original_width * ratio)
+            height = int(original_height * ratio)
+
+    return width, height
+
+
+def _convert_image_vips(input_path: str, output_path: str, quality: int) -> None:
+    """
+    Convert with libvips, streaming scanlines instead of decoding the whole image
+    """
+    image = pyvips.Image.new_from_file(input_path, access='sequential')
+    _vips_save(image, output_path, quality=quality, optimize=True)
+
+
+def _resize_image_vips(input_path: str, output_path: str, width: int, height: int) -> None:
+    """
+    Resize with libvips thumbnail, which uses shrink-on-load for JPEG/WebP
+    """
+    image = pyvips.Image.thumbnail(input_path, width, height=height, size='force', no_rotate=True)
+    _vips_save(image, output_path)
+
+
+def _compress_image_vips(
+    input_path: str,
+    output_path: str,
+    quality: int,
+    max_width: Optional[int],
+    max_height: Optional[int]
+) -> None:
+    """
+    Compress with libvips, only ever shrinking to fit max_width x max_height
+    """
+    if max_width or max_height:
+        # Effectively unbounded on the side that was not given
+        image = pyvips.Image.thumbnail(
+            input_path,
+            max_width or 10000000,
+            height=max_height or 10000000,
+            size='down',
+            no_rotate=True
+        )
+    else:
+        image = pyvips.Image.new_from_file(input_path, access='sequential')
+    _vips_save(image, output_path, quality=quality, optimize=True)
+
+
+def _convert_image_sync(input_path: str, output_path: str, target_format: str, quality: int) -> bool:
+    """
+    Convert image to different format (runs in a worker process)
+    """
+    try:
+        # Nothing to re-encode: just move the file into place
+        src_format = _normalize_format(os.path.splitext(input_path)[1])
+        if src_format == _normalize_format(target_format) and quality == DEFAULT_CONVERT_QUALITY:
+            _move_file(input_path, output_path)
+            return True
+
+        if _use_vips(output_path):
+            try:
+                _convert_image_vips(input_path, output_path, quality)
+                _safe_unlink(input_path)
+                return True
+            except pyvips.Error as e:
+                logger.warning(f"libvips conversion failed, falling back to PIL: {str(e)}")
+
+        # Open image
+        with Image.open(input_path) as img:
+            # Convert to RGB if necessary (for JPEG)
+            if target_format.lower() in ['jpg', 'jpeg'] and img.mode in ['RGBA', 'P']:
+                img = img.convert('RGB')
+
+            # Save with specified quality
+            save_kwargs = {}
+            if target_format.lower() in ['jpg', 'jpeg']:
+                save_kwargs['quality'] = quality
+                save_kwargs.update(JPEG_SAVE_OPTIONS)
+            elif target_format.lower() == 'png':
+                save_kwargs['optimize'] = True
+            elif target_format.lower() == 'webp':
+                save_kwargs['quality'] = quality
+                save_kwargs.update(WEBP_SAVE_OPTIONS)
+
+            # PIL registers JPEG under "JPEG" only
+            pil_format = 'JPEG' if _normalize_format(target_format) == 'jpg' else target_format.upper()
+            img.save(output_path, format=pil_format, **save_kwargs)
+
+        # Clean up input file
+        _safe_unlink(input_path)
+
+        return True
+
+    except Exception as e:
+        logger.error(f"Error converting image: {str(e)}")
+        return False
+
+
+# Integer pre-reduction for the PIL resize/compress paths only kicks in once
+# the downscale ratio reaches this gap; at 3.0 the result is visually
+# indistinguishable from a single full LANCZOS pass.
+RESIZE_REDUCING_GAP = 3.0
+
+
+def _resize_image_sync(
+    input_path: str,
+    output_path: str,
+    width: Optional[int],
+    height: Optional[int],
+    maintain_aspect_ratio: bool
+) -> bool:
+    """
+    Resize image to specified dimensions (runs in a worker process)
+    """
+    try:
+        if _use_vips(output_path):
+            try:
+                # Only the header is read here
+                header = pyvips.Image.new_from_file(input_path)
+                width, height = _target_dimensions(
+                    header.width, header.height, width, height, maintain_aspect_ratio
+                )
+
+                if (width, height) == (header.width, header.height) and _same_format(input_path, output_path):
+                    _move_file(input_path, output_path)
+                else:
+                    _resize_image_vips(input_path, output_path, width, height)
+                    _safe_unlink(input_path)
+                return True
+            except pyvips.Error as e:
+                logger.warning(f"libvips resize failed, falling back to PIL: {str(e)}")
+
+        with Image.open(input_path) as img:
+            original_width, original_height = img.size
+            width, height = _target_dimensions(
+                original_width, original_height, width, height, maintain_aspect_ratio
+            )
+
+            unchanged = (width, height) == (original_width, original_height) and \
+                _same_format(input_path, output_path)
+
+            if not unchanged:
+                # Resize image. For large downscales, reducing_gap first box-
+                # reduces by an integer factor in C, leaving LANCZOS at most a
+                # ~3x step over far fewer pixels.
+                resized_img = img.resize(
+                    (width, height), Image.Resampling.LANCZOS, reducing_gap=RESIZE_REDUCING_GAP
+                )
+                resized_img.save(output_path)
+
+        if unchanged:
+            _move_file(input_path, output_path)
+            return True
+
+        # Clean up input file
+        _safe_unlink(input_path)
+
+        return True
+
+    except Exception as e:
+        logger.error(f"Error resizing image: {str(e)}")
+        return False
+
+
+def _crop_image_sync(input_path: str, output_path: str, x: int, y: int, width: int, height: int) -> bool:
+    """
+    Crop image to specified rectangle (runs in a worker process)
+    """
+    try:
+        with Image.open(input_path) as img:
+            # Define crop box (left, top, right, bottom)
+            crop_box = (x, y, x + width, y + height)
+
+            unchanged = crop_box == (0, 0) + img.size and _same_format(input_path, output_path)
+
+            if not unchanged:
+                # Crop image
+                cropped_img = img.crop(crop_box)
+                cropped_img.save(output_path)
+
+        if unchanged:
+            _move_file(input_path, output_path)
+            return True
+
+        # Clean up input file
+        _safe_unlink(input_path)
+
+        return True
+
+    except Exception as e:
+        logger.error(f"Error cropping image: {str(e)}")
+        return False
+
+
+def _remove_background_sync(input_path: str, output_path: str, session) -> bool:
+    """
+    Remove background with rembg (runs in a worker thread)
+    """
+    try:
+        # rembg works on PIL images internally, so hand it one directly:
+        # no bytes round-trip in and no ndarray conversions either side
+        with Image.open(input_path) as input_img:
+            output_img = remove(input_img, session=session)
+
+        # Save output (level 1 encodes several times faster than the default 6)
+        output_img.save(output_path, format='PNG', compress_level=1)
+
+        # Clean up input file
+        _safe_unlink(input_path)
+
+        return True
+
+    except Exception as e:
+        logger.error(f"Error removing background: {str(e)}")
+        return False
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _grabcut_to_bgra(bgr, mask, out):
+        # GC_FGD (1) and GC_PR_FGD (3) are the odd mask values
+        for i in prange(bgr.shape[0]):
+            for j in range(bgr.shape[1]):
+                out[i, j, 0] = bgr[i, j, 0]
+                out[i, j, 1] = bgr[i, j, 1]
+                out[i, j, 2] = bgr[i, j, 2]
+                out[i, j, 3] = 255 if mask[i, j] & 1 else 0
+
+
+# GrabCut refinement rounds. The segmentation barely moves after the third
+# iteration, while each one costs a full GMM fit and graph cut.
+GRABCUT_ITERATIONS = 3
+
+# Per-process GrabCut GMM buffers. GC_INIT_WITH_RECT re-initializes them on
+# every call, so they only need allocating once.
+_grabcut_models = None
+
+
+def _get_grabcut_models():
+    """
+    Return the (bgdModel, fgdModel) arrays for this worker process
+    """
+    global _grabcut_models
+    if _grabcut_models is None:
+        _grabcut_models = (np.zeros((1, 65), np.float64), np.zeros((1, 65), np.float64))
+    return _grabcut_models
+
+
+def _simple_background_removal_sync(input_path: str, output_path: str) -> bool:
+    """
+    Simple background removal fallback using OpenCV (runs in a worker process)
+    """
+    try:
+        # Read image
+        img = cv2.imread(input_path)
+
+        # Apply GrabCut algorithm for background removal
+        height, width = img.shape[:2]
+        mask = np.zeros((height, width), np.uint8)
+        bgdModel, fgdModel = _get_grabcut_models()
+
+        # Define rectangle around the main object (simple heuristic)
+        rect = (width//8, height//8, 6*width//8, 6*height//8)
+
+        cv2.grabCut(img, mask, rect, bgdModel, fgdModel, GRABCUT_ITERATIONS, cv2.GC_INIT_WITH_RECT)
+
+        if NUMBA_AVAILABLE:
+            # Build the transparent result in a single pass over img and mask
+            img_rgba = np.empty((height, width, 4), dtype=np.uint8)
+            _grabcut_to_bgra(img, mask, img_rgba)
+        else:
+            # Foreground and probable foreground become 255, everything else 0
+            alpha = cv2.bitwise_or(
+                cv2.compare(mask, cv2.GC_FGD, cv2.CMP_EQ),
+                cv2.compare(mask, cv2.GC_PR_FGD, cv2.CMP_EQ)
+            )
+
+            # Apply mask to create result with transparency
+            img_rgba = cv2.merge([*cv2.split(img), alpha])
+
+        # Save as PNG to preserve transparency
+        cv2.imwrite(output_path, img_rgba)
+
+        # Clean up input file
+        _safe_unlink(input_path)
+
+        return True
+
+    except Exception as e:
+        logger.error(f"Error in simple background removal: {str(e)}")
+        return False
+
+
+def _compress_image_sync(
+    input_path: str,
+    output_path: str,
+    quality: int,
+    max_width: Optional[int],
+    max_height: Optional[int]
+) -> bool:
+    """
+    Compress image to reduce file size (runs in a worker process)
+    """
+    try:
+        if _use_vips(output_path):
+            try:
+                _compress_image_vips(input_path, output_path, quality, max_width, max_height)
+                _safe_unlink(input_path)
+                return True
+            except pyvips.Error as e:
+                logger.warning(f"libvips compression failed, falling back to PIL: {str(e)}")
+
+        with Image.open(input_path) as img:
+            # Shrink to fit max dimensions in a single resize, scaled by the
+            # tighter of the two limits. thumbnail() runs draft() first, so
+            # JPEGs are decoded at 1/2, 1/4 or 1/8 scale straight from the DCT
+            # coefficients, then reduced with a box filter before the final
+            # LANCZOS pass.
+            if max_width or max_height:
+                original_width, original_height = img.size
+                img.thumbnail(
+                    (max_width or original_width, max_height or original_height),
+                    Image.Resampling.LANCZOS,
+                    reducing_gap=RESIZE_REDUCING_GAP
+                )
+
+            # Convert to RGB if saving as JPEG
+            file_ext = os.path.splitext(output_path)[1].lower()
+            if file_ext in ['.jpg', '.jpeg'] and img.mode in ['RGBA', 'P']:
+                img = img.convert('RGB')
+
+            # Save with compression
+            save_kwargs = {'optimize': True}
+            if file_ext in ['.jpg', '.jpeg']:
+                save_kwargs['quality'] = quality
+                save_kwargs.update(JPEG_SAVE_OPTIONS)
+            elif file_ext == '.webp':
+                save_kwargs['quality'] = quality
+                save_kwargs.update(WEBP_SAVE_OPTIONS)
+
+            img.save(output_path, **save_kwargs)
+
+        # Clean up input file
+        _safe_unlink(input_path)
+
+        return True
+
+    except Exception as e:
+        logger.error(f"Error compressing image: {str(e)}")
+        return False
+
+
+_CV2_ROTATE_FORMATS = {'jpg', 'png', 'webp', 'bmp', 'tif', 'tiff'}
+
+
+def _use_cv2_rotate(output_path: str) -> bool:
+    """
+    Whether OpenCV can write the rotated image in the requested format
+    """
+    return _normalize_format(os.path.splitext(output_path)[1]) in _CV2_ROTATE_FORMATS
+
+
+def _cv2_write_params(output_path: str) -> list:
+    """
+    imwrite parameters matching PIL's default save quality
+    """
+    fmt = _normalize_format(os.path.splitext(output_path)[1])
+    if fmt == 'jpg':
+        return [cv2.IMWRITE_JPEG_QUALITY, 75]
+    if fmt == 'webp':
+        return [cv2.IMWRITE_WEBP_QUALITY, 80]
+    return []
+
+
+def _rotate_array_cv2(img, angle: float):
+    """
+    Rotate counter-clockwise onto an expanded canvas, sampling exactly like
+    PIL's rotate(angle, expand=True) with its default nearest-neighbour filter
+    """
+    height, width = img.shape[:2]
+    theta = -math.radians(angle)
+    cos_t, sin_t = round(math.cos(theta), 15), round(math.sin(theta), 15)
+
+    # Size of the rotated bounding box, rounded outwards as PIL does
+    tx = width / 2.0 - (cos_t * width / 2.0 + sin_t * height / 2.0)
+    ty = height / 2.0 - (-sin_t * width / 2.0 + cos_t * height / 2.0)
+    corners = ((0, 0), (width, 0), (width, height), (0, height))
+    xs = [cos_t * x + sin_t * y + tx for x, y in corners]
+    ys = [-sin_t * x + cos_t * y + ty for x, y in corners]
+    new_width = math.ceil(max(xs)) - math.floor(min(xs))
+    new_height = math.ceil(max(ys)) - math.floor(min(ys))
+
+    # Output -> input mapping about the image centres. PIL samples at pixel
+    # centres and floors; OpenCV samples at indices and rounds, hence the
+    # half-pixel shifts.
+    cx, cy = new_width / 2.0 - 0.5, new_height / 2.0 - 0.5
+    matrix = np.array([
+        [cos_t, sin_t, width / 2.0 - 0.5 - (cos_t * cx + sin_t * cy)],
+        [-sin_t, cos_t, height / 2.0 - 0.5 - (-sin_t * cx + cos_t * cy)],
+    ])
+
+    return cv2.warpAffine(
+        img,
+        matrix,
+        (new_width, new_height),
+        flags=cv2.INTER_NEAREST | cv2.WARP_INVERSE_MAP,
+        borderMode=cv2.BORDER_CONSTANT,
+        borderValue=0
+    )
+
+
+def _rotate_image_sync(input_path: str, output_path: str, angle: float) -> bool:
+    """
+    Rotate image by specified angle (runs in a worker process)
+    """
+    try:
+        # Quarter turns are lossless transposes in PIL already; OpenCV's
+        # vectorized warpAffine only pays off for arbitrary angles
+        if CV2_AVAILABLE and angle % 90 != 0 and _use_cv2_rotate(output_path):
+            img = cv2.imread(input_path, cv2.IMREAD_UNCHANGED)
+            if img is not None:
+                cv2.imwrite(output_path, _rotate_array_cv2(img, angle), _cv2_write_params(output_path))
+                _safe_unlink(input_path)
+                return True
+
+        with Image.open(input_path) as img:
+            # Rotate image
+            rotated_img = img.rotate(angle, expand=True)
+            rotated_img.save(output_path)
+
+        # Clean up input file
+        _safe_unlink(input_path)
+
+        return True
+
+    except Exception as e:
+        logger.error(f"Error rotating image: {str(e)}")
+        return False
+
+
+# Edge length of the square tiles the fused enhance pipeline works on. A
+# 512x512 float32 RGB tile is ~3 MB, so all four adjustments run on data that
+# is still cache-resident instead of streaming the whole image from DRAM per op.
+ENHANCE_TILE_SIZE = 512
+
+
+def _luma(rgb):
+    """
+    ITU-R 601-2 luma of a float RGB array, as used by PIL's "L" conversion
+    """
+    return rgb[..., 0] * 0.299 + rgb[..., 1] * 0.587 + rgb[..., 2] * 0.114
+
+
+def _iter_tiles(height: int, width: int, tile_size: int):
+    """
+    Yield (y0, y1, x0, x1) bounds covering an image in square tiles
+    """
+    for y0 in range(0, height, tile_size):
+        for x0 in range(0, width, tile_size):
+            yield y0, min(y0 + tile_size, height), x0, min(x0 + tile_size, width)
+
+
+def _enhance_tile(rgb, brightness: float, contrast: float, contrast_mean: float, saturation: float):
+    """
+    Apply brightness, contrast and saturation in place to a float32 RGB tile,
+    clamping after each step like the equivalent ImageEnhance chain
+    """
+    if brightness != 1.0:
+        rgb *= brightness
+        np.clip(rgb, 0, 255, out=rgb)
+
+    if contrast != 1.0:
+        rgb -= contrast_mean
+        rgb *= contrast
+        rgb += contrast_mean
+        np.clip(rgb, 0, 255, out=rgb)
+
+    if saturation != 1.0:
+        gray = _luma(rgb)[..., None]
+        rgb -= gray
+        rgb *= saturation
+        rgb += gray
+        np.clip(rgb, 0, 255, out=rgb)
+
+
+def _sharpen_region(region, sharpness: float):
+    """
+    Blend a float32 region with its ImageFilter.SMOOTH version, in place.
+    The outermost ring is left untouched; callers pass a one-pixel halo.
+    """
+    center = region[1:-1, 1:-1]
+    smooth = (
+        region[:-2, :-2] + region[:-2, 1:-1] + region[:-2, 2:] +
+        region[1:-1, :-2] + 5 * center + region[1:-1, 2:] +
+        region[2:, :-2] + region[2:, 1:-1] + region[2:, 2:]
+    ) / 13
+    center -= smooth
+    center *= sharpness
+    center += smooth
+    np.clip(center, 0, 255, out=center)
+
+
+def _enhance_array(arr, brightness: float, contrast: float, saturation: float, sharpness: float):
+    """
+    Run the brightness -> contrast -> saturation -> sharpness chain over an
+    RGB(A) uint8 array tile by tile and return a new array. Alpha is preserved.
+    """
+    height, width = arr.shape[:2]
+    tile_size = ENHANCE_TILE_SIZE
+
+    # Contrast pivots on the mean luma of the brightness-adjusted image,
+    # which needs one cheap read-only pass before the main loop
+    contrast_mean = 0.0
+    if contrast != 1.0:
+        total = 0.0
+        for y0, y1, x0, x1 in _iter_tiles(height, width, tile_size):
+            rgb = arr[y0:y1, x0:x1, :3].astype(np.float32)
+            if brightness != 1.0:
+                rgb *= brightness
+                np.clip(rgb, 0, 255, out=rgb)
+            total += float(_luma(rgb).sum())
+        contrast_mean = int(total / (height * width) + 0.5)
+
+    out = arr.copy()
+    halo = 1 if sharpness != 1.0 else 0
+
+    for y0, y1, x0, x1 in _iter_tiles(height, width, tile_size):
+        # Sharpness needs neighbours, so read a one-pixel halo around the tile
+        ry0, ry1 = max(0, y0 - halo), min(height, y1 + halo)
+        rx0, rx1 = max(0, x0 - halo), min(width, x1 + halo)
+
+        region = arr[ry0:ry1, rx0:rx1, :3].astype(np.float32)
+        _enhance_tile(region, brightness, contrast, contrast_mean, saturation)
+        if halo:
+            _sharpen_region(region, sharpness)
+
+        out[y0:y1, x0:x1, :3] = np.rint(region[y0 - ry0:y1 - ry0, x0 - rx0:x1 - rx0])
+
+    return out
+
+
+if NUMBA_AVAILABLE:
+    @njit(inline='always', cache=True)
+    def _clamp(value):
+        return 0.0 if value < 0.0 else (255.0 if value > 255.0 else value)
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _brightness_luma_sum(src, brightness):
+        total = 0.0
+        for i in prange(src.shape[0]):
+            row_total = 0.0
+            for j in range(src.shape[1]):
+                r = _clamp(src[i, j, 0] * brightness)
+                g = _clamp(src[i, j, 1] * brightness)
+                b = _clamp(src[i, j, 2] * brightness)
+                row_total += r * 0.299 + g * 0.587 + b * 0.114
+            total += row_total
+        return total
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _enhance_kernel(src, dst, brightness, contrast, contrast_mean, saturation):
+        has_alpha = src.shape[2] == 4
+        for i in prange(src.shape[0]):
+            for j in range(src.shape[1]):
+                r = float(src[i, j, 0])
+                g = float(src[i, j, 1])
+                b = float(src[i, j, 2])
+
+                if brightness != 1.0:
+                    r = _clamp(r * brightness)
+                    g = _clamp(g * brightness)
+                    b = _clamp(b * brightness)
+
+                if contrast != 1.0:
+                    r = _clamp((r - contrast_mean) * contrast + contrast_mean)
+                    g = _clamp((g - contrast_mean) * contrast + contrast_mean)
+                    b = _clamp((b - contrast_mean) * contrast + contrast_mean)
+
+                if saturation != 1.0:
+                    gray = r * 0.299 + g * 0.587 + b * 0.114
+                    r = _clamp(gray + (r - gray) * saturation)
+                    g = _clamp(gray + (g - gray) * saturation)
+                    b = _clamp(gray + (b - gray) * saturation)
+
+                dst[i, j, 0] = np.uint8(r + 0.5)
+                dst[i, j, 1] = np.uint8(g + 0.5)
+                dst[i, j, 2] = np.uint8(b + 0.5)
+                if has_alpha:
+                    dst[i, j, 3] = src[i, j, 3]
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _sharpen_kernel(src, dst, sharpness):
+        # ImageEnhance.Sharpness: blend the rounded SMOOTH-filtered pixel
+        # with the original. The outer ring and alpha are copied unchanged.
+        height, width = src.shape[0], src.shape[1]
+        dst[:] = src
+        for i in prange(1, height - 1):
+            for j in range(1, width - 1):
+                for k in range(3):
+                    center = float(src[i, j, k])
+                    total = (
+                        float(src[i - 1, j - 1, k]) + float(src[i - 1, j, k]) + float(src[i - 1, j + 1, k]) +
+                        float(src[i, j - 1, k]) + 5.0 * center + float(src[i, j + 1, k]) +
+                        float(src[i + 1, j - 1, k]) + float(src[i + 1, j, k]) + float(src[i + 1, j + 1, k])
+                    )
+                    smooth = np.floor(total / 13.0 + 0.5)
+                    dst[i, j, k] = np.uint8(_clamp(smooth + (center - smooth) * sharpness) + 0.5)
+
+
+def _sharpen_filter2d(arr, sharpness: float) -> None:
+    """
+    Apply ImageEnhance.Sharpness to a uint8 RGB(A) array in place using a
+    single convolution: blend(SMOOTH, identity, factor) folded into one kernel
+    """
+    height, width = arr.shape[:2]
+    if height < 3 or width < 3:
+        return
+
+    kernel = np.full((3, 3), (1.0 - sharpness) / 13, dtype=np.float32)
+    kernel[1, 1] = 5 * (1.0 - sharpness) / 13 + sharpness
+
+    rgb = np.ascontiguousarray(arr[..., :3])
+    sharpened = cv2.filter2D(rgb, -1, kernel)
+
+    # PIL leaves the outermost ring unfiltered
+    sharpened[0], sharpened[-1] = rgb[0], rgb[-1]
+    sharpened[:, 0], sharpened[:, -1] = rgb[:, 0], rgb[:, -1]
+    arr[..., :3] = sharpened
+
+
+def _enhance_array_jit(arr, brightness: float, contrast: float, saturation: float, sharpness: float):
+    """
+    Numba-compiled equivalent of _enhance_array: a single parallel,
+    allocation-free pass for the colour adjustments plus one 3x3 sharpen
+    """
+    height, width = arr.shape[:2]
+
+    contrast_mean = 0.0
+    if contrast != 1.0:
+        contrast_mean = float(int(_brightness_luma_sum(arr, brightness) / (height * width) + 0.5))
+
+    out = np.empty_like(arr)
+    _enhance_kernel(arr, out, brightness, contrast, contrast_mean, saturation)
+
+    if sharpness != 1.0:
+        if CV2_AVAILABLE:
+            # OpenCV's vectorized filter2D beats the scalar 3x3 loop
+            _sharpen_filter2d(out, sharpness)
+        else:
+            sharpened = np.empty_like(out)
+            _sharpen_kernel(out, sharpened, sharpness)
+            out = sharpened
+
+    return out
+
+
+# Modes the fused enhance path accepts, mapped to the RGB(A) layout it works
+# in. Palette images are expanded once up front; ImageEnhance cannot blend them.
+_FUSED_ENHANCE_MODES = {'RGB': 'RGB', 'RGBA': 'RGBA', 'L': 'RGB', 'LA': 'RGBA', 'P': 'RGB', 'PA': 'RGBA'}
+
+
+def _enhance_image_sync(
+    input_path: str,
+    output_path: str,
+    brightness: float,
+    contrast: float,
+    saturation: float,
+    sharpness: float
+) -> bool:
+    """
+    Enhance image with various adjustments (runs in a worker process)
+    """
+    try:
+        with Image.open(input_path) as img:
+            if NUMPY_AVAILABLE and img.mode in _FUSED_ENHANCE_MODES:
+                # Decode to a single RGB(A) array once; every adjustment then
+                # works on that buffer instead of materializing PIL intermediates
+                original_mode = img.mode
+                work_mode = _FUSED_ENHANCE_MODES[original_mode]
+                if original_mode == 'P' and 'transparency' in img.info:
+                    work_mode = 'RGBA'
+                arr = np.asarray(img if original_mode == work_mode else img.convert(work_mode))
+
+                if NUMBA_AVAILABLE:
+                    # JIT-compiled fused kernel
+                    arr = _enhance_array_jit(arr, brightness, contrast, saturation, sharpness)
+                else:
+                    # Fused, cache-blocked pipeline: one pass over the pixels
+                    arr = _enhance_array(arr, brightness, contrast, saturation, sharpness)
+                img = Image.fromarray(arr, work_mode)
+
+                # Greyscale stays greyscale: saturation is a no-op on grey pixels
+                if original_mode in ('L', 'LA'):
+                    img = img.convert(original_mode)
+            else:
+                # Apply enhancements
+                if brightness != 1.0:
+                    enhancer = ImageEnhance.Brightness(img)
+                    img = enhancer.enhance(brightness)
+
+                if contrast != 1.0:
+                    enhancer = ImageEnhance.Contrast(img)
+                    img = enhancer.enhance(contrast)
+
+                if saturation != 1.0:
+                    enhancer = ImageEnhance.Color(img)
+                    img = enhancer.enhance(saturation)
+
+                if sharpness != 1.0:
+                    enhancer = ImageEnhance.Sharpness(img)
+                    img = enhancer.enhance(sharpness)
+
+            img.save(output_path)
+
+        # Clean up input file
+        _safe_unlink(input_path)
+
+        return True
+
+    except Exception as e:
+        logger.error(f"Error enhancing image: {str(e)}")
+        return False
+
+
+@lru_cache(maxsize=32)
+def _get_font(size: int):
+    """
+    Load the watermark font once per size, falling back to PIL's default
+    """
+    try:
+        return ImageFont.truetype("arial.ttf", size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+@lru_cache(maxsize=64)
+def _render_watermark_text(text: str, font_size: int, alpha: int):
+    """
+    Rasterize watermark text once into a tight RGBA tile.
+
+    Returns the tile and its (left, top, right, bottom) bbox relative to the
+    text origin. Only the glyph area is cached, not a full-size overlay.
+    """
+    font = _get_font(font_size)
+    bbox = ImageDraw.Draw(Image.new('RGBA', (1, 1))).textbbox((0, 0), text, font=font)
+    tile = Image.new('RGBA', (max(1, bbox[2] - bbox[0]), max(1, bbox[3] - bbox[1])), (0, 0, 0, 0))
+    ImageDraw.Draw(tile).text((-bbox[0], -bbox[1]), text, font=font, fill=(255, 255, 255, alpha))
+    return tile, bbox
+
+
+def _add_watermark_sync(
+    input_path: str,
+    output_path: str,
+    watermark_text: str,
+    position: str,
+    opacity: float
+) -> bool:
+    """
+    Add text watermark to image (runs in a worker process)
+    """
+    try:
+        with Image.open(input_path) as img:
+            # Create watermark
+            font_size = max(20, img.size[0] // 30)
+            alpha = int(255 * opacity)
+            tile, bbox = _render_watermark_text(watermark_text, font_size, alpha)
+
+            # Get text size
+            text_width = bbox[2] - bbox[0]
+            text_height = bbox[3] - bbox[1]
+
+            # Calculate position
+            margin = 20
+            if position == "bottom-right":
+                x = img.size[0] - text_width - margin
+                y = img.size[1] - text_height - margin
+            elif position == "bottom-left":
+                x = margin
+                y = img.size[1] - text_height - margin
+            elif position == "top-right":
+                x = img.size[0] - text_width - margin
+                y = margin
+            elif position == "top-left":
+                x = margin
+                y = margin
+            else:  # center
+                x = (img.size[0] - text_width) // 2
+                y = (img.size[1] - text_height) // 2
+
+            # Composite watermark onto image
+            if img.mode != 'RGBA':
+                img = img.convert('RGBA')
+
+            # Only the tile's footprint is blended; clip it to the canvas
+            dest_x, dest_y = x + bbox[0], y + bbox[1]
+            img.alpha_composite(
+                tile,
+                dest=(max(0, dest_x), max(0, dest_y)),
+                source=(max(0, -dest_x), max(0, -dest_y))
+            )
+            watermarked = img
+
+            # Convert back to RGB if needed
+            save_kwargs = {}
+            if output_path.lower().endswith(('.jpg', '.jpeg')):
+                watermarked = watermarked.convert('RGB')
+                save_kwargs.update(JPEG_SAVE_OPTIONS)
+            elif output_path.lower().endswith('.webp'):
+                save_kwargs.update(WEBP_SAVE_OPTIONS)
+
+            watermarked.save(output_path, **save_kwargs)
+
+        # Clean up input file
+        _safe_unlink(input_path)
+
+        return True
+
+    except Exception as e:
+        logger.error(f"Error adding watermark: {str(e)}")
+        return False
+
+
+def _warmup_worker() -> None:
+    """
+    Load lazily-initialized codecs, fonts and JIT kernels in a worker process
+    """
+    img = Image.new('RGB', (8, 8))
+    for image_format in ('JPEG', 'PNG', 'WEBP'):
+        img.save(io.BytesIO(), format=image_format)
+    _get_font(20)
+
+    if NUMPY_AVAILABLE:
+        # Same (read-only) array type the enhance path passes in
+        _enhance_image_array = _enhance_array_jit if NUMBA_AVAILABLE else _enhance_array
+        _enhance_image_array(np.asarray(img), 1.1, 1.1, 1.1, 1.1)
+
+    if CV2_AVAILABLE:
+        cv2.imencode('.png', np.zeros((8, 8, 3), np.uint8))
+
+
 class ImageService:
     """Service for image processing operations"""
-    
+
     def __init__(self):
         # Initialize background removal session
         self.pil_available = PIL_AVAILABLE
         self.cv2_available = CV2_AVAILABLE
         self.rembg_available = REMBG_AVAILABLE
-        
+
+        if self.pil_available and not features.check_feature('libjpeg_turbo'):
+            logger.warning("Pillow is not linked against libjpeg-turbo; JPEG encode/decode will be slower")
+
+        if PILLOW_SIMD:
+            logger.info(f"Pillow-SIMD {PIL_VERSION} acceleration active")
+
         if self.rembg_available:
             try:
-                self.bg_removal_session = new_session('u2net')
+                self.bg_removal_session = self._create_bg_removal_session()
             except Exception as e:
                 logger.warning(f"Could not initialize background removal: {str(e)}")
                 self.bg_removal_session = None
         else:
             self.bg_removal_session = None
-    
+
+    def _create_bg_removal_session(self):
+        """
+        Create the U2Net session with a bounded thread pool and warm it up
+        """
+        # ONNX Runtime defaults to one intra-op thread per core in every
+        # Uvicorn worker; split the cores between workers instead. rembg
+        # reads the thread count from OMP_NUM_THREADS.
+        threads = settings.REMBG_THREADS
+        if not threads:
+            workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+            threads = max(1, (os.cpu_count() or 1) // max(1, workers))
+        os.environ.setdefault('OMP_NUM_THREADS', str(threads))
+
+        session = new_session('u2net', providers=['CPUExecutionProvider'])
+
+        # The first inference pays for graph optimization and kernel setup;
+        # do it now rather than on the first request
+        remove(Image.new('RGB', (32, 32)), session=session)
+
+        return session
+
+    async def warmup(self) -> None:
+        """
+        Start every worker process and pay first-call costs before the first request
+        """
+        if not self.pil_available:
+            return
+
+        try:
+            await asyncio.gather(*[run_in_process(_warmup_worker) for _ in range(PROCESS_POOL_WORKERS)])
+        except Exception as e:
+            logger.warning(f"Image worker warmup failed: {str(e)}")
+
+    async def _run_in_process(self, func, *args) -> bool:
+        """
+        Run a CPU-bound worker function in the process pool
+        """
+        return await run_in_process(func, *args)
+
     async def convert_image(
-        self, 
-        input_path: str, 
-        output_path: str, 
+        self,
+        input_path: str,
+        output_path: str,
         target_format: str,
-        quality: int = 95
+        quality: int = DEFAULT_CONVERT_QUALITY
     ) -> bool:
         """
         Convert image to different format
@@ -70,41 +1124,15 @@ class ImageService:
         if not self.pil_available:
             logger.error("PIL not available for image conversion")
             return False
-            
-        try:
-            # Open image
-            with Image.open(input_path) as img:
-                # Convert to RGB if necessary (for JPEG)
-                if target_format.lower() in ['jpg', 'jpeg'] and img.mode in ['RGBA', 'P']:
-                    img = img.convert('RGB')
-                
-                # Save with specified quality
-                save_kwargs = {}
-                if target_format.lower() in ['jpg', 'jpeg']:
-                    save_kwargs['quality'] = quality
-                    save_kwargs['optimize'] = True
-                elif target_format.lower() == 'png':
-                    save_kwargs['optimize'] = True
-                elif target_format.lower() == 'webp':
-                    save_kwargs['quality'] = quality
-                    save_kwargs['optimize'] = True
-                
-                img.save(output_path, format=target_format.upper(), **save_kwargs)
-            
-            # Clean up input file
-            if os.path.exists(input_path):
-                os.remove(input_path)
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error converting image: {str(e)}")
-            return False
-    
+
+        return await self._run_in_process(
+            _convert_image_sync, input_path, output_path, target_format, quality
+        )
+
     async def resize_image(
-        self, 
-        input_path: str, 
-        output_path: str, 
+        self,
+        input_path: str,
+        output_path: str,
         width: Optional[int] = None,
         height: Optional[int] = None,
         maintain_aspect_ratio: bool = True
@@ -115,47 +1143,18 @@ class ImageService:
         if not self.pil_available:
             logger.error("PIL not available for image resizing")
             return False
-            
-        try:
-            with Image.open(input_path) as img:
-                original_width, original_height = img.size
-                
-                if maintain_aspect_ratio:
-                    if width and not height:
-                        # Calculate height based on width
-                        ratio = width / original_width
-                        height = int(original_height * ratio)
-                    elif height and not width:
-                        # Calculate width based on height
-                        ratio = height / original_height
-                        width = int(original_width * ratio)
-                    elif width and height:
-                        # Use the smaller ratio to fit within bounds
-                        ratio = min(width / original_width, height / original_height)
-                        width = int(original_width * ratio)
-                        height = int(original_height * ratio)
-                
-                # Resize image
-                resized_img = img.resize((width, height), Image.Resampling.LANCZOS)
-                resized_img.save(output_path)
-            
-            # Clean up input file
-            if os.path.exists(input_path):
-                os.remove(input_path)
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error resizing image: {str(e)}")
-            return False
-    
+
+        return await self._run_in_process(
+            _resize_image_sync, input_path, output_path, width, height, maintain_aspect_ratio
+        )
+
     async def crop_image(
-        self, 
-        input_path: str, 
-        output_path: str, 
-        x: int, 
-        y: int, 
-        width: int, 
+        self,
+        input_path: str,
+        output_path: str,
+        x: int,
+        y: int,
+        width: int,
         height: int
     ) -> bool:
         """
@@ -164,59 +1163,29 @@ class ImageService:
         if not self.pil_available:
             logger.error("PIL not available for image cropping")
             return False
-            
-        try:
-            with Image.open(input_path) as img:
-                # Define crop box (left, top, right, bottom)
-                crop_box = (x, y, x + width, y + height)
-                
-                # Crop image
-                cropped_img = img.crop(crop_box)
-                cropped_img.save(output_path)
-            
-            # Clean up input file
-            if os.path.exists(input_path):
-                os.remove(input_path)
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error cropping image: {str(e)}")
-            return False
-    
+
+        return await self._run_in_process(
+            _crop_image_sync, input_path, output_path, x, y, width, height
+        )
+
     async def remove_background(self, input_path: str, output_path: str) -> bool:
         """
         Remove background from image using AI
         """
         if self.rembg_available and self.bg_removal_session is not None:
-            try:
-                # Read input image
-                with open(input_path, 'rb') as input_file:
-                    input_data = input_file.read()
-                
-                # Remove background
-                output_data = remove(input_data, session=self.bg_removal_session)
-                
-                # Save output
-                with open(output_path, 'wb') as output_file:
-                    output_file.write(output_data)
-                
-                # Clean up input file
-                if os.path.exists(input_path):
-                    os.remove(input_path)
-                
+            loop = asyncio.get_running_loop()
+            if await loop.run_in_executor(
+                _thread_pool, _remove_background_sync, input_path, output_path, self.bg_removal_session
+            ):
                 return True
-                
-            except Exception as e:
-                logger.error(f"Error removing background: {str(e)}")
-        
+
         # Fallback: simple background removal using OpenCV
         if self.cv2_available:
             return await self._simple_background_removal(input_path, output_path)
         else:
             logger.error("Background removal not available - no suitable libraries found")
             return False
-    
+
     async def _simple_background_removal(self, input_path: str, output_path: str) -> bool:
         """
         Simple background removal fallback using OpenCV
@@ -224,49 +1193,13 @@ class ImageService:
         if not self.cv2_available:
             logger.error("OpenCV not available for background removal")
             return False
-            
-        try:
-            # Read image
-            img = cv2.imread(input_path)
-            
-            # Convert to grayscale
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            
-            # Apply GrabCut algorithm for background removal
-            mask = np.zeros(gray.shape[:2], np.uint8)
-            bgdModel = np.zeros((1, 65), np.float64)
-            fgdModel = np.zeros((1, 65), np.float64)
-            
-            # Define rectangle around the main object (simple heuristic)
-            height, width = img.shape[:2]
-            rect = (width//8, height//8, 6*width//8, 6*height//8)
-            
-            cv2.grabCut(img, mask, rect, bgdModel, fgdModel, 5, cv2.GC_INIT_WITH_RECT)
-            
-            # Create mask
-            mask2 = np.where((mask == 2) | (mask == 0), 0, 1).astype('uint8')
-            
-            # Apply mask to create result with transparency
-            img_rgba = cv2.cvtColor(img, cv2.COLOR_BGR2BGRA)
-            img_rgba[:, :, 3] = mask2 * 255
-            
-            # Save as PNG to preserve transparency
-            cv2.imwrite(output_path, img_rgba)
-            
-            # Clean up input file
-            if os.path.exists(input_path):
-                os.remove(input_path)
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error in simple background removal: {str(e)}")
-            return False
-    
+
+        return await self._run_in_process(_simple_background_removal_sync, input_path, output_path)
+
     async def compress_image(
-        self, 
-        input_path: str, 
-        output_path: str, 
+        self,
+        input_path: str,
+        output_path: str,
         quality: int = 80,
         max_width: Optional[int] = None,
         max_height: Optional[int] = None
@@ -277,47 +1210,11 @@ class ImageService:
         if not self.pil_available:
             logger.error("PIL not available for image compression")
             return False
-            
-        try:
-            with Image.open(input_path) as img:
-                # Resize if max dimensions specified
-                if max_width or max_height:
-                    original_width, original_height = img.size
-                    
-                    if max_width and original_width > max_width:
-                        ratio = max_width / original_width
-                        new_height = int(original_height * ratio)
-                        img = img.resize((max_width, new_height), Image.Resampling.LANCZOS)
-                    
-                    if max_height and img.size[1] > max_height:
-                        ratio = max_height / img.size[1]
-                        new_width = int(img.size[0] * ratio)
-                        img = img.resize((new_width, max_height), Image.Resampling.LANCZOS)
-                
-                # Convert to RGB if saving as JPEG
-                file_ext = os.path.splitext(output_path)[1].lower()
-                if file_ext in ['.jpg', '.jpeg'] and img.mode in ['RGBA', 'P']:
-                    img = img.convert('RGB')
-                
-                # Save with compression
-                save_kwargs = {'optimize': True}
-                if file_ext in ['.jpg', '.jpeg']:
-                    save_kwargs['quality'] = quality
-                elif file_ext == '.webp':
-                    save_kwargs['quality'] = quality
-                
-                img.save(output_path, **save_kwargs)
-            
-            # Clean up input file
-            if os.path.exists(input_path):
-                os.remove(input_path)
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error compressing image: {str(e)}")
-            return False
-    
+
+        return await self._run_in_process(
+            _compress_image_sync, input_path, output_path, quality, max_width, max_height
+        )
+
     async def rotate_image(self, input_path: str, output_path: str, angle: float) -> bool:
         """
         Rotate image by specified angle
@@ -325,26 +1222,12 @@ class ImageService:
         if not self.pil_available:
             logger.error("PIL not available for image rotation")
             return False
-            
-        try:
-            with Image.open(input_path) as img:
-                # Rotate image
-                rotated_img = img.rotate(angle, expand=True)
-                rotated_img.save(output_path)
-            
-            # Clean up input file
-            if os.path.exists(input_path):
-                os.remove(input_path)
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error rotating image: {str(e)}")
-            return False
-    
+
+        return await self._run_in_process(_rotate_image_sync, input_path, output_path, angle)
+
     async def enhance_image(
-        self, 
-        input_path: str, 
+        self,
+        input_path: str,
         output_path: str,
         brightness: float = 1.0,
         contrast: float = 1.0,
@@ -357,42 +1240,15 @@ class ImageService:
         if not self.pil_available:
             logger.error("PIL not available for image enhancement")
             return False
-            
-        try:
-            with Image.open(input_path) as img:
-                # Apply enhancements
-                if brightness != 1.0:
-                    enhancer = ImageEnhance.Brightness(img)
-                    img = enhancer.enhance(brightness)
-                
-                if contrast != 1.0:
-                    enhancer = ImageEnhance.Contrast(img)
-                    img = enhancer.enhance(contrast)
-                
-                if saturation != 1.0:
-                    enhancer = ImageEnhance.Color(img)
-                    img = enhancer.enhance(saturation)
-                
-                if sharpness != 1.0:
-                    enhancer = ImageEnhance.Sharpness(img)
-                    img = enhancer.enhance(sharpness)
-                
-                img.save(output_path)
-            
-            # Clean up input file
-            if os.path.exists(input_path):
-                os.remove(input_path)
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error enhancing image: {str(e)}")
-            return False
-    
+
+        return await self._run_in_process(
+            _enhance_image_sync, input_path, output_path, brightness, contrast, saturation, sharpness
+        )
+
     async def add_watermark(
-        self, 
-        input_path: str, 
-        output_path: str, 
+        self,
+        input_path: str,
+        output_path: str,
         watermark_text: str,
         position: str = "bottom-right",
         opacity: float = 0.7
@@ -403,67 +1259,7 @@ class ImageService:
         if not self.pil_available:
             logger.error("PIL not available for watermarking")
             return False
-            
-        try:
-            from PIL import ImageDraw, ImageFont
-            
-            with Image.open(input_path) as img:
-                # Create watermark
-                watermark = Image.new('RGBA', img.size, (0, 0, 0, 0))
-                draw = ImageDraw.Draw(watermark)
-                
-                # Try to use a nice font, fallback to default
-                try:
-                    font_size = max(20, img.size[0] // 30)
-                    font = ImageFont.truetype("arial.ttf", font_size)
-                except:
-                    font = ImageFont.load_default()
-                
-                # Get text size
-                bbox = draw.textbbox((0, 0), watermark_text, font=font)
-                text_width = bbox[2] - bbox[0]
-                text_height = bbox[3] - bbox[1]
-                
-                # Calculate position
-                margin = 20
-                if position == "bottom-right":
-                    x = img.size[0] - text_width - margin
-                    y = img.size[1] - text_height - margin
-                elif position == "bottom-left":
-                    x = margin
-                    y = img.size[1] - text_height - margin
-                elif position == "top-right":
-                    x = img.size[0] - text_width - margin
-                    y = margin
-                elif position == "top-left":
-                    x = margin
-                    y = margin
-                else:  # center
-                    x = (img.size[0] - text_width) // 2
-                    y = (img.size[1] - text_height) // 2
-                
-                # Draw text with transparency
-                alpha = int(255 * opacity)
-                draw.text((x, y), watermark_text, font=font, fill=(255, 255, 255, alpha))
-                
-                # Composite watermark onto image
-                if img.mode != 'RGBA':
-                    img = img.convert('RGBA')
-                
-                watermarked = Image.alpha_composite(img, watermark)
-                
-                # Convert back to RGB if needed
-                if output_path.lower().endswith(('.jpg', '.jpeg')):
-                    watermarked = watermarked.convert('RGB')
-                
-                watermarked.save(output_path)
-            
-            # Clean up input file
-            if os.path.exists(input_path):
-                os.remove(input_path)
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error adding watermark: {str(e)}")
-            return False 
\ No newline at end of file
+
+        return await self._run_in_process(
+            _add_watermark_sync, input_path, output_path, watermark_text, position, opacity
+        )
@@ -2,39 +2,475 @@
 PDF processing service
 """
 
+import io
 import os
 import asyncio
-from typing import List, Optional
+import contextlib
+import hashlib
+import mmap
+import shutil
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import AsyncIterator, Callable, Iterator, List, Optional, Sequence, Tuple
 from PyPDF2 import PdfReader, PdfWriter
-from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 from pdf2docx import Converter
 import logging
 
+from app.core.process_pool import PROCESS_POOL_WORKERS, run_in_process, submit
+
 logger = logging.getLogger(__name__)
 
+# qpdf-backed page copying, handled gracefully if not available
+try:
+    import pikepdf
+    PIKEPDF_AVAILABLE = True
+except ImportError as e:
+    logger.warning(f"pikepdf not available, using PyPDF2 for merge/split: {str(e)}")
+    PIKEPDF_AVAILABLE = False
+    pikepdf = None
+
+try:
+    import pypdfium2 as pdfium
+    PDFIUM_AVAILABLE = True
+except ImportError as e:
+    logger.warning(f"pypdfium2 not available, using PyPDF2 for text extraction: {str(e)}")
+    PDFIUM_AVAILABLE = False
+    pdfium = None
+
+# PDFium is not thread-safe, not even across separate documents, and
+# pypdfium2 adds no locking; every PDFium call in this process is queued on
+# this one thread
+_pdfium_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdfium")
+
+# The qpdf command line merges natively when the pikepdf bindings are missing
+QPDF_PATH = shutil.which("qpdf")
+
+# Batched file writes through io_uring (Linux), handled gracefully if not available
+try:
+    import liburing
+    LIBURING_AVAILABLE = True
+except (ImportError, OSError) as e:
+    logger.warning(f"liburing not available, split pages are written one by one: {str(e)}")
+    LIBURING_AVAILABLE = False
+    liburing = None
+
+def _open_reader(path: str) -> PdfReader:
+    """
+    Open a PdfReader over a read-only memory map of path. Given a path,
+    PyPDF2 reads the whole file into memory; through a mapping the kernel
+    pages in only what the parser touches (the xref and the objects used).
+    """
+    with open(path, 'rb') as pdf_file:
+        try:
+            mapping = mmap.mmap(pdf_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped; let PyPDF2 report them
+            return PdfReader(path)
+    return PdfReader(mapping)
+
+# Split pages are serialized in memory and written this many at a time, so
+# one io_uring submission covers a whole batch while memory stays bounded
+URING_BATCH = 64
+
+@lru_cache(maxsize=1)
+def _uring_usable() -> bool:
+    """
+    Whether an io_uring can be created here; container seccomp profiles
+    commonly block it. Probed once.
+    """
+    if not LIBURING_AVAILABLE:
+        return False
+    
+    ring = liburing.Ring()
+    try:
+        liburing.io_uring_queue_init(1, ring, 0)
+    except OSError as e:
+        logger.warning(f"io_uring unavailable, split pages are written one by one: {str(e)}")
+        return False
+    liburing.io_uring_queue_exit(ring)
+    return True
+
+def _write_files(files: List[Tuple[str, bytes]]) -> None:
+    """
+    Write a batch of in-memory files. With io_uring every write is queued
+    and submitted at once, against registered file descriptors and buffers
+    so the kernel skips per-operation lookups and page pinning.
+    """
+    if not _uring_usable():
+        for path, data in files:
+            with open(path, 'wb') as output_file:
+                output_file.write(data)
+        return
+    
+    ring = liburing.Ring()
+    cqe = liburing.Cqe()
+    # A plain ring: a kernel SQ polling thread would be spawned and torn
+    # down for every batch, costing more than the writes it submits
+    liburing.io_uring_queue_init(len(files), ring, 0)
+    fds = []
+    try:
+        for path, _ in files:
+            fds.append(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666))
+        
+        # Both registrations are referenced by the kernel until unregistered
+        file_index = liburing.FileIndex(fds)
+        liburing.io_uring_register_files(ring, file_index)
+        buffers = [data for _, data in files]
+        try:
+            iovecs = liburing.Iovec(buffers)
+            liburing.io_uring_register_buffers(ring, iovecs)
+            fixed_buffers = True
+        except OSError:
+            # Registered buffers count against RLIMIT_MEMLOCK
+            fixed_buffers = False
+        
+        for index, data in enumerate(buffers):
+            sqe = liburing.io_uring_get_sqe(ring)
+            if fixed_buffers:
+                liburing.io_uring_prep_write_fixed(sqe, index, data, index, 0)
+            else:
+                liburing.io_uring_prep_write(sqe, index, data, 0)
+            liburing.io_uring_sqe_set_flags(sqe, liburing.IOSQE_FIXED_FILE)
+            liburing.io_uring_sqe_set_data64(sqe, index)
+        liburing.io_uring_submit(ring)
+        
+        # Drain whatever has completed after each wait and release it with a
+        # single CQ head update, rather than waiting on every write in turn
+        remaining = len(files)
+        while remaining:
+            liburing.io_uring_wait_cqe(ring, cqe)
+            ready = liburing.io_uring_cq_ready(ring)
+            try:
+                for position in range(ready):
+                    completion = cqe[position]
+                    index = completion.user_data
+                    # Raises OSError for a failed write
+                    written = completion.res
+                    
+                    # Regular files rarely write short, but finish one if they do
+                    data = buffers[index]
+                    while written < len(data):
+                        written += os.pwrite(fds[index], data[written:], written)
+            finally:
+                liburing.io_uring_cq_advance(ring, ready)
+            remaining -= ready
+    finally:
+        # Tears down the registrations along with the ring
+        liburing.io_uring_queue_exit(ring)
+        for fd in fds:
+            os.close(fd)
+
+def _write_split_pages(output_dir: str, pages: List[int], render) -> None:
+    """
+    Save page_<n>.pdf for each page number, rendering pages to bytes with
+    render(n) and writing them a batch at a time
+    """
+    for start in range(0, len(pages), URING_BATCH):
+        _write_files([
+            (os.path.join(output_dir, f"page_{page_num}.pdf"), render(page_num))
+            for page_num in pages[start:start + URING_BATCH]
+        ])
+
+def _renderer_executor() -> Optional[ThreadPoolExecutor]:
+    """
+    Executor for work done through _page_renderer: the PDFium thread, or
+    the loop's default pool for qpdf
+    """
+    return _pdfium_executor if PDFIUM_AVAILABLE else None
+
+@contextlib.contextmanager
+def _page_renderer(input_path: str) -> Iterator[Tuple[int, Callable[[int], bytes]]]:
+    """
+    Open a PDF once and yield its page count with a function that renders a
+    1-based page as a standalone PDF: PDFium imports the page into a fresh
+    document, qpdf copies its objects. Not thread-safe; run it on
+    _renderer_executor().
+    """
+    if PDFIUM_AVAILABLE:
+        pdf = pdfium.PdfDocument(input_path)
+        
+        def render(page_num: int) -> bytes:
+            single = pdfium.PdfDocument.new()
+            try:
+                single.import_pages(pdf, [page_num - 1])  # Convert to 0-based index
+                buffer = io.BytesIO()
+                single.save(buffer)
+                return buffer.getvalue()
+            finally:
+                single.close()
+        
+        try:
+            yield len(pdf), render
+        finally:
+            pdf.close()
+    else:
+        with pikepdf.Pdf.open(input_path) as pdf:
+            def render(page_num: int) -> bytes:
+                with pikepdf.Pdf.new() as single:
+                    single.pages.append(pdf.pages[page_num - 1])  # Convert to 0-based index
+                    buffer = io.BytesIO()
+                    single.save(buffer)
+                return buffer.getvalue()
+            
+            yield len(pdf.pages), render
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Unseekable file that collects what is written to it until taken; lets
+    zipfile build an archive piece by piece for streaming
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+# PyPDF2 serializes objects with many small writes; a 1 MiB buffer turns
+# them into a handful of syscalls (the default is 8 KiB)
+PDF_WRITE_BUFFER = 1024 * 1024
+
+# PyPDF2 text extraction is pure Python and holds the GIL, so long documents
+# are cut into page ranges extracted side by side in worker processes
+PARALLEL_EXTRACT_MIN_PAGES = 8
+
+def _extract_pages(path: str, indices: Sequence[int]) -> str:
+    """
+    Extract text from the given 0-based pages of a PDF, in a worker process
+    """
+    reader = _open_reader(path)
+    return "".join(f"{reader.pages[index].extract_text()}\n" for index in indices)
+
+def _page_indices(pages: Optional[List[int]], page_count: int) -> Sequence[int]:
+    """
+    0-based indices for 1-based page numbers, skipping any out of range;
+    every page when none are given
+    """
+    if not pages:
+        return range(page_count)
+    return [page_num - 1 for page_num in pages if 1 <= page_num <= page_count]
+
+def _convert_pdf_to_docx(input_path: str, output_path: str) -> None:
+    """
+    Convert a PDF to Word with pdf2docx, in a worker process: its layout
+    analysis is pure Python and would hold the GIL for the whole conversion
+    """
+    cv = Converter(input_path)
+    try:
+        cv.convert(output_path, start=0, end=None)
+    finally:
+        cv.close()
+
+# PDFium is several times faster per page, so fanning out only pays off on
+# longer documents than for PyPDF2
+PDFIUM_PARALLEL_MIN_PAGES = 64
+
+def _count_pages_pdfium(path: str) -> int:
+    """
+    Number of pages in a PDF, read with PDFium
+    """
+    pdf = pdfium.PdfDocument(path)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+def _extract_pages_pdfium(path: str, indices: Sequence[int]) -> str:
+    """
+    Extract text from the given 0-based pages of a PDF with PDFium's native
+    text layer; other pages' content streams are never parsed. PDFium is not
+    thread-safe: run this on the PDFium thread or in a worker process.
+    """
+    pdf = pdfium.PdfDocument(path)
+    try:
+        parts = []
+        for index in indices:
+            page = pdf[index]
+            textpage = page.get_textpage()
+            # PDFium separates lines with CRLF
+            parts.append(textpage.get_text_range().replace("\r\n", "\n"))
+            textpage.close()
+            page.close()
+        
+        # Same layout as the PyPDF2 path: one newline after every page
+        return "".join(f"{part}\n" for part in parts)
+    finally:
+        pdf.close()
+
+def _dedupe_content_streams(pdf) -> None:
+    """
+    Point pages whose content streams decode to identical bytes (letterheads,
+    repeated boilerplate pages) at one shared stream object; qpdf then writes
+    each distinct stream once and drops the unreferenced copies
+    """
+    seen = {}
+    
+    def shared(stream):
+        try:
+            digest = hashlib.blake2b(stream.read_bytes(), digest_size=16).digest()
+        except pikepdf.PdfError:
+            # Undecodable filter; leave this stream as it is
+            return stream
+        return seen.setdefault(digest, stream)
+    
+    for page in pdf.pages:
+        contents = page.obj.get('/Contents')
+        if isinstance(contents, pikepdf.Array):
+            for index, stream in enumerate(contents):
+                contents[index] = shared(stream)
+        elif isinstance(contents, pikepdf.Stream):
+            page.obj.Contents = shared(contents)
+
+@lru_cache(maxsize=64)
+def _render_watermark_pdf(watermark_text: str, page_width: float, page_height: float) -> bytes:
+    """
+    Render a one-page watermark PDF in memory, centred on a page of the given size
+    """
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=(page_width, page_height))
+    c.setFont("Helvetica", 50)
+    c.setFillAlpha(0.3)
+    c.drawCentredString(page_width / 2, page_height / 2, watermark_text)
+    c.save()
+    return buffer.getvalue()
+
+@lru_cache(maxsize=64)
+def _render_watermark_page(watermark_text: str, page_width: float, page_height: float):
+    """
+    Parsed PyPDF2 page of the watermark for a page of the given size
+    """
+    return PdfReader(io.BytesIO(_render_watermark_pdf(watermark_text, page_width, page_height))).pages[0]
+
+# PyPDF2 rewrites are pure Python and hold the GIL for the whole document,
+# so the fallbacks below run in the process pool rather than a thread
+
+def _compress_pdf_pypdf2(input_path: str, output_path: str) -> None:
+    """
+    Rewrite a PDF with PyPDF2, Flate-compressing every page's content, in a
+    worker process
+    """
+    reader = _open_reader(input_path)
+    writer = PdfWriter()
+    
+    for page in reader.pages:
+        # Apply basic compression
+        page.compress_content_streams()
+        writer.add_page(page)
+    
+    with open(output_path, 'wb', buffering=PDF_WRITE_BUFFER) as output_file:
+        writer.write(output_file)
+
+def _pdf_to_word_text(input_path: str, output_path: str) -> None:
+    """
+    Write a Word document holding just the PDF's text, one paragraph per
+    page, in a worker process
+    """
+    from docx import Document
+    
+    # Extract text using PyPDF2 as fallback
+    reader = _open_reader(input_path)
+    doc = Document()
+    
+    for page in reader.pages:
+        text = page.extract_text()
+        if text.strip():
+            doc.add_paragraph(text)
+    
+    doc.save(output_path)
+
+def _add_watermark_pypdf2(input_path: str, output_path: str, watermark_text: str) -> None:
+    """
+    Merge the watermark into every page's content with PyPDF2, in a worker
+    process
+    """
+    reader = _open_reader(input_path)
+    writer = PdfWriter()
+    
+    # Apply watermark to each page, rendered once per page size
+    for page in reader.pages:
+        watermark_page = _render_watermark_page(
+            watermark_text, float(page.mediabox.width), float(page.mediabox.height)
+        )
+        page.merge_page(watermark_page)
+        writer.add_page(page)
+    
+    with open(output_path, 'wb', buffering=PDF_WRITE_BUFFER) as output_file:
+        writer.write(output_file)
+
 class PDFService:
     """Service for PDF processing operations"""
     
+    async def warmup(self) -> None:
+        """
+        Pay first-call costs of the PDF libraries before the first request
+        """
+        try:
+            await asyncio.to_thread(self._warmup)
+        except Exception as e:
+            logger.warning(f"PDF warmup failed: {str(e)}")
+    
+    def _warmup(self) -> None:
+        """
+        Run a one-page document through every PDF backend
+        """
+        buffer = io.BytesIO()
+        c = canvas.Canvas(buffer)
+        c.drawString(100, 700, "warmup")
+        c.save()
+        pdf_bytes = buffer.getvalue()
+        
+        writer = PdfWriter()
+        writer.add_page(PdfReader(io.BytesIO(pdf_bytes)).pages[0])
+        writer.write(io.BytesIO())
+        
+        if PIKEPDF_AVAILABLE:
+            with pikepdf.Pdf.open(io.BytesIO(pdf_bytes)) as pdf:
+                pdf.save(io.BytesIO())
+        
+        if PDFIUM_AVAILABLE:
+            _pdfium_executor.submit(lambda: pdfium.PdfDocument(pdf_bytes).close()).result()
+        
+        # pdf2docx pulls in PyMuPDF and python-docx on first use; conversions
+        # run in the process pool, so start a worker and warm it there
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pdf_path = os.path.join(temp_dir, "warmup.pdf")
+            with open(pdf_path, 'wb') as pdf_file:
+                pdf_file.write(pdf_bytes)
+            submit(_convert_pdf_to_docx, pdf_path, os.path.join(temp_dir, "warmup.docx")).result()
+    
     async def merge_pdfs(self, input_paths: List[str], output_path: str) -> bool:
         """
         Merge multiple PDF files into one
         """
         try:
-            writer = PdfWriter()
-            
-            for pdf_path in input_paths:
-                reader = PdfReader(pdf_path)
-                for page in reader.pages:
-                    writer.add_page(page)
-            
-            with open(output_path, 'wb') as output_file:
-                writer.write(output_file)
+            if PIKEPDF_AVAILABLE:
+                await asyncio.to_thread(self._merge_pdfs_pikepdf, input_paths, output_path)
+            elif QPDF_PATH:
+                await self._merge_pdfs_qpdf(input_paths, output_path)
+            else:
+                # Parse all inputs concurrently; PdfWriter itself is not thread-safe
+                readers = await asyncio.gather(
+                    *[asyncio.to_thread(_open_reader, pdf_path) for pdf_path in input_paths]
+                )
+                # Serialization resolves every page object; keep it off the event loop
+                await asyncio.to_thread(self._write_merged_pypdf2, readers, output_path)
             
             # Clean up input files
-            for pdf_path in input_paths:
-                if os.path.exists(pdf_path):
-                    os.remove(pdf_path)
+            await asyncio.gather(*[self._unlink(pdf_path) for pdf_path in input_paths])
             
             return True
             
@@ -47,25 +483,34 @@ class PDFService:
         Split PDF into separate files
         """
         try:
-            reader = PdfReader(input_path)
-            total_pages = len(reader.pages)
-            
-            if pages is None:
-                # Split each page into separate files
-                pages = list(range(1, total_pages + 1))
-            
-            for i, page_num in enumerate(pages):
-                if 1 <= page_num <= total_pages:
-                    writer = PdfWriter()
-                    writer.add_page(reader.pages[page_num - 1])  # Convert to 0-based index
-                    
-                    output_file = os.path.join(output_dir, f"page_{page_num}.pdf")
-                    with open(output_file, 'wb') as out_file:
-                        writer.write(out_file)
+            if PDFIUM_AVAILABLE or PIKEPDF_AVAILABLE:
+                await asyncio.get_running_loop().run_in_executor(
+                    _renderer_executor(), self._split_pdf_native, input_path, output_dir, pages
+                )
+            else:
+                reader = await asyncio.to_thread(_open_reader, input_path)
+                total_pages = len(reader.pages)
+                
+                if not pages:
+                    # Split each page into separate files
+                    pages = list(range(1, total_pages + 1))
+                
+                # Write pages from worker threads, capped to avoid disk thrashing
+                semaphore = asyncio.Semaphore(os.cpu_count() or 1)
+                reader_lock = threading.Lock()
+                
+                async def write_page(page_num: int) -> None:
+                    async with semaphore:
+                        await asyncio.to_thread(
+                            self._write_single_page, reader, reader_lock, page_num, output_dir
+                        )
+                
+                await asyncio.gather(
+                    *[write_page(page_num) for page_num in pages if 1 <= page_num <= total_pages]
+                )
             
             # Clean up input file
-            if os.path.exists(input_path):
-                os.remove(input_path)
+            await self._unlink(input_path)
             
             return True
             
@@ -73,25 +518,124 @@ class PDFService:
             logger.error(f"Error splitting PDF: {str(e)}")
             return False
     
-    async def compress_pdf(self, input_path: str, output_path: str, quality: int = 80) -> bool:
+    async def split_pdf_stream(self, input_path: str, pages: Optional[List[int]] = None) -> AsyncIterator[bytes]:
         """
-        Compress PDF file (basic implementation)
+        Split PDF and yield a ZIP of the single-page PDFs as each page is
+        rendered, without writing the pages to disk. Needs PDFium or
+        pikepdf. Removes the input when done.
         """
+        chunks = self._split_pdf_zip(input_path, pages)
+        loop = asyncio.get_running_loop()
+        executor = _renderer_executor()
         try:
-            reader = PdfReader(input_path)
-            writer = PdfWriter()
-            
+            # Each step renders a page; keep it off the event loop, and on
+            # the PDFium thread when that is the backend
+            while (chunk := await loop.run_in_executor(executor, next, chunks, None)) is not None:
+                if chunk:
+                    yield chunk
+        finally:
+            # Closing the generator closes the source document, so it runs
+            # on the same executor; with PDFium it queues behind any step
+            # still running (client gone mid-page). On the qpdf pool such a
+            # step makes close fail, and the generator is closed when collected.
+            with contextlib.suppress(ValueError):
+                await loop.run_in_executor(executor, chunks.close)
+            await self._unlink(input_path)
+    
+    def _merge_pdfs_pikepdf(self, input_paths: List[str], output_path: str) -> None:
+        """
+        Merge PDFs with qpdf, which copies page objects natively
+        """
+        with contextlib.ExitStack() as stack:
+            merged = stack.enter_context(pikepdf.Pdf.new())
+            for pdf_path in input_paths:
+                # Sources stay open until save; stream data is copied lazily
+                source = stack.enter_context(pikepdf.Pdf.open(pdf_path))
+                merged.pages.extend(source.pages)
+            merged.save(output_path)
+    
+    async def _merge_pdfs_qpdf(self, input_paths: List[str], output_path: str) -> None:
+        """
+        Merge PDFs with one qpdf process, without building Python page objects
+        """
+        process = await asyncio.create_subprocess_exec(
+            QPDF_PATH, "--empty", "--pages", *input_paths, "--", output_path,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        _, stderr = await process.communicate()
+        # Exit status 3 means the output was written with warnings
+        if process.returncode not in (0, 3):
+            raise RuntimeError(f"qpdf merge failed: {stderr.decode(errors='replace').strip()}")
+    
+    def _write_merged_pypdf2(self, readers: List[PdfReader], output_path: str) -> None:
+        """
+        Write the pages of every reader, in order, to one PDF with PyPDF2
+        """
+        writer = PdfWriter()
+        for reader in readers:
             for page in reader.pages:
-                # Apply basic compression
-                page.compress_content_streams()
                 writer.add_page(page)
+        
+        with open(output_path, 'wb', buffering=PDF_WRITE_BUFFER) as output_file:
+            writer.write(output_file)
+    
+    def _split_pdf_native(self, input_path: str, output_dir: str, pages: Optional[List[int]]) -> None:
+        """
+        Split PDF into separate files with PDFium or qpdf, parsing the source once
+        """
+        with _page_renderer(input_path) as (total_pages, render):
+            if not pages:
+                # Split each page into separate files
+                pages = list(range(1, total_pages + 1))
             
-            with open(output_path, 'wb') as output_file:
-                writer.write(output_file)
+            _write_split_pages(output_dir, [page_num for page_num in pages if 1 <= page_num <= total_pages], render)
+    
+    def _split_pdf_zip(self, input_path: str, pages: Optional[List[int]]) -> Iterator[bytes]:
+        """
+        Render the requested pages (all by default) as single-page PDFs and
+        yield a ZIP archive of them piece by piece. Blocking.
+        """
+        sink = _ChunkSink()
+        with _page_renderer(input_path) as (total_pages, render):
+            if not pages:
+                pages = list(range(1, total_pages + 1))
+            
+            # Page streams are already compressed; store them as they are
+            with zipfile.ZipFile(sink, 'w', zipfile.ZIP_STORED) as archive:
+                for page_num in pages:
+                    if 1 <= page_num <= total_pages:
+                        archive.writestr(f"page_{page_num}.pdf", render(page_num))
+                        yield sink.take()
+        yield sink.take()
+    
+    def _write_single_page(
+        self, reader: PdfReader, reader_lock: threading.Lock, page_num: int, output_dir: str
+    ) -> None:
+        """
+        Write one page of a PDF to its own file
+        """
+        writer = PdfWriter()
+        # Cloning the page resolves objects through the reader's shared stream
+        with reader_lock:
+            writer.add_page(reader.pages[page_num - 1])  # Convert to 0-based index
+        
+        output_file = os.path.join(output_dir, f"page_{page_num}.pdf")
+        with open(output_file, 'wb', buffering=PDF_WRITE_BUFFER) as out_file:
+            writer.write(out_file)
+    
+    async def compress_pdf(self, input_path: str, output_path: str, quality: int = 80) -> bool:
+        """
+        Compress PDF file (basic implementation)
+        """
+        try:
+            if PIKEPDF_AVAILABLE:
+                await asyncio.to_thread(self._compress_pdf_pikepdf, input_path, output_path)
+            else:
+                await run_in_process(_compress_pdf_pypdf2, input_path, output_path)
             
             # Clean up input file
-            if os.path.exists(input_path):
-                os.remove(input_path)
+            await self._unlink(input_path)
             
             return True
             
@@ -99,23 +643,36 @@ class PDFService:
             logger.error(f"Error compressing PDF: {str(e)}")
             return False
     
+    def _compress_pdf_pikepdf(self, input_path: str, output_path: str) -> None:
+        """
+        Rewrite a PDF with qpdf: share duplicate page content streams,
+        re-encode every stream with Flate and pack objects into object
+        streams, in a single native pass
+        """
+        with pikepdf.Pdf.open(input_path) as pdf:
+            _dedupe_content_streams(pdf)
+            pdf.save(
+                output_path,
+                compress_streams=True,
+                recompress_flate=True,
+                stream_decode_level=pikepdf.StreamDecodeLevel.generalized,
+                object_stream_mode=pikepdf.ObjectStreamMode.generate
+            )
+    
     async def pdf_to_word(self, input_path: str, output_path: str) -> bool:
         """
         Convert PDF to Word document using pdf2docx
         """
         try:
             # Use pdf2docx for high-quality conversion
-            cv = Converter(input_path)
-            cv.convert(output_path, start=0, end=None)
-            cv.close()
+            await run_in_process(_convert_pdf_to_docx, input_path, output_path)
             
             # Verify the output file was created
             if not os.path.exists(output_path):
                 raise Exception("Output file was not created")
             
             # Clean up input file
-            if os.path.exists(input_path):
-                os.remove(input_path)
+            await self._unlink(input_path)
             
             return True
             
@@ -123,22 +680,10 @@ class PDFService:
             logger.error(f"Error converting PDF to Word: {str(e)}")
             # Fallback to basic implementation if pdf2docx fails
             try:
-                from docx import Document
-                
-                # Extract text using PyPDF2 as fallback
-                reader = PdfReader(input_path)
-                doc = Document()
-                
-                for page in reader.pages:
-                    text = page.extract_text()
-                    if text.strip():
-                        doc.add_paragraph(text)
-                
-                doc.save(output_path)
+                await run_in_process(_pdf_to_word_text, input_path, output_path)
                 
                 # Clean up input file
-                if os.path.exists(input_path):
-                    os.remove(input_path)
+                await self._unlink(input_path)
                 
                 logger.info("Used fallback method for PDF to Word conversion")
                 return True
@@ -152,33 +697,13 @@ class PDFService:
         Add watermark to PDF
         """
         try:
-            reader = PdfReader(input_path)
-            writer = PdfWriter()
+            if PIKEPDF_AVAILABLE:
+                await asyncio.to_thread(self._add_watermark_pikepdf, input_path, output_path, watermark_text)
+            else:
+                await run_in_process(_add_watermark_pypdf2, input_path, output_path, watermark_text)
             
-            # Create watermark PDF
-            watermark_path = f"{output_path}_watermark.pdf"
-            c = canvas.Canvas(watermark_path, pagesize=letter)
-            c.setFont("Helvetica", 50)
-            c.setFillAlpha(0.3)
-            c.drawCentredText(300, 400, watermark_text)
-            c.save()
-            
-            watermark_reader = PdfReader(watermark_path)
-            watermark_page = watermark_reader.pages[0]
-            
-            # Apply watermark to each page
-            for page in reader.pages:
-                page.merge_page(watermark_page)
-                writer.add_page(page)
-            
-            with open(output_path, 'wb') as output_file:
-                writer.write(output_file)
-            
-            # Clean up
-            if os.path.exists(input_path):
-                os.remove(input_path)
-            if os.path.exists(watermark_path):
-                os.remove(watermark_path)
+            # Clean up input file
+            await self._unlink(input_path)
             
             return True
             
@@ -186,18 +711,94 @@ class PDFService:
             logger.error(f"Error adding watermark: {str(e)}")
             return False
     
-    async def extract_text(self, input_path: str) -> str:
+    def _add_watermark_pikepdf(self, input_path: str, output_path: str, watermark_text: str) -> None:
         """
-        Extract text from PDF
+        Stamp the watermark over every page with qpdf; each page gets a form
+        XObject reference instead of having its content stream rewritten
+        """
+        with pikepdf.Pdf.open(input_path) as pdf, contextlib.ExitStack() as stack:
+            # Rendered and imported once per page size
+            overlays = {}
+            for page in pdf.pages:
+                x0, y0, x1, y1 = (float(value) for value in page.mediabox)
+                size = (x1 - x0, y1 - y0)
+                if size not in overlays:
+                    watermark = stack.enter_context(
+                        pikepdf.Pdf.open(io.BytesIO(_render_watermark_pdf(watermark_text, *size)))
+                    )
+                    overlays[size] = pdf.copy_foreign(watermark.pages[0].as_form_xobject())
+                page.add_overlay(overlays[size])
+            pdf.save(output_path)
+    
+    async def _unlink(self, file_path: str) -> None:
+        """
+        Remove a file off the event loop, ignoring it if already gone
+        """
+        with contextlib.suppress(FileNotFoundError):
+            await asyncio.to_thread(os.remove, file_path)
+    
+    def clear_cache(self) -> None:
+        """
+        Release the cached watermark renderings
+        """
+        _render_watermark_page.cache_clear()
+        _render_watermark_pdf.cache_clear()
+    
+    async def _extract_text_pdfium(self, input_path: str, pages: Optional[List[int]]) -> str:
+        """
+        Extract text from PDF with PDFium, spreading long documents over the
+        process pool
+        """
+        # Short documents stay in this process, on the PDFium thread
+        loop = asyncio.get_running_loop()
+        page_count = await loop.run_in_executor(_pdfium_executor, _count_pages_pdfium, input_path)
+        indices = _page_indices(pages, page_count)
+        
+        if len(indices) < PDFIUM_PARALLEL_MIN_PAGES or PROCESS_POOL_WORKERS == 1:
+            return await loop.run_in_executor(_pdfium_executor, _extract_pages_pdfium, input_path, indices)
+        
+        chunk = -(-len(indices) // PROCESS_POOL_WORKERS)
+        parts = await asyncio.gather(*[
+            run_in_process(_extract_pages_pdfium, input_path, indices[start:start + chunk])
+            for start in range(0, len(indices), chunk)
+        ])
+        return "".join(parts)
+    
+    async def _extract_text_pypdf2(self, input_path: str, pages: Optional[List[int]]) -> str:
+        """
+        Extract text from PDF with PyPDF2, spreading long documents over the
+        process pool
+        """
+        reader = await asyncio.to_thread(_open_reader, input_path)
+        indices = _page_indices(pages, len(reader.pages))
+        
+        if len(indices) < PARALLEL_EXTRACT_MIN_PAGES:
+            return await asyncio.to_thread(
+                lambda: "".join(f"{reader.pages[index].extract_text()}\n" for index in indices)
+            )
+        
+        # One contiguous slice per worker keeps the per-process parse to once
+        chunk = -(-len(indices) // PROCESS_POOL_WORKERS)
+        parts = await asyncio.gather(*[
+            run_in_process(_extract_pages, input_path, indices[start:start + chunk])
+            for start in range(0, len(indices), chunk)
+        ])
+        return "".join(parts)
+    
+    async def extract_text(self, input_path: str, pages: Optional[List[int]] = None) -> str:
+        """
+        Extract text from PDF, from every page or only the given 1-based
+        pages; unrequested pages are not parsed
         """
         try:
-            reader = PdfReader(input_path)
-            text = ""
-            
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
+            if PDFIUM_AVAILABLE:
+                try:
+                    return await self._extract_text_pdfium(input_path, pages)
+                except pdfium.PdfiumError as e:
+                    # PyPDF2 tolerates some damage PDFium rejects
+                    logger.warning(f"PDFium text extraction failed, retrying with PyPDF2: {str(e)}")
             
-            return text
+            return await self._extract_text_pypdf2(input_path, pages)
             
         except Exception as e:
             logger.error(f"Error extracting text from PDF: {str(e)}")
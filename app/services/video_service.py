@@ -4,26 +4,194 @@ Video processing service
 
 import os
 import asyncio
-from typing import Optional
+import bisect
+import contextlib
+import glob
+import shutil
+import tempfile
+from collections import OrderedDict
+from typing import AsyncIterator, List, Optional, Tuple
 import logging
 
+from app.core.config import settings
+
 logger = logging.getLogger(__name__)
 
-# Try to import video processing libraries, handle gracefully if not available
 try:
-    from moviepy.editor import VideoFileClip, concatenate_videoclips
-    VIDEO_AVAILABLE = True
+    from PIL import Image, ImageDraw, ImageFont
+    PIL_AVAILABLE = True
 except ImportError as e:
-    logger.warning(f"Video processing not available: {str(e)}")
-    VIDEO_AVAILABLE = False
-    VideoFileClip = None
-    concatenate_videoclips = None
+    logger.warning(f"PIL not available, video watermarks disabled: {str(e)}")
+    PIL_AVAILABLE = False
+    Image = None
+    ImageDraw = None
+    ImageFont = None
+
+from app.services.ffmpeg_utils import (
+    CONCAT_LIST_INPUT, FFMPEG_AVAILABLE, FFmpegError, can_copy_audio, concat_copy, concat_list, detect_hw_h264_encoder,
+    forget_file, probe_duration, probe_streams, run_ffmpeg, scratch_path
+)
+
+# Inputs shorter than this are encoded in a single ffmpeg run; longer ones are
+# cut at keyframes into SEGMENT_SECONDS pieces that are encoded in parallel
+SEGMENT_THRESHOLD_SECONDS = 60
+SEGMENT_SECONDS = 30
+
+# Audio bitrate reserved out of the size budget for two-pass compression
+TWO_PASS_AUDIO_KBPS = 128
+
+# convert_video quality presets to video bitrate
+CONVERT_BITRATES = {"low": "500k", "medium": "1000k", "high": "2000k"}
+
+# compress_video quality (10-100) to libx264 CRF; lower CRF is better quality
+CRF_QUALITY_STEPS = [10, 20, 30, 40, 50, 60, 70, 80, 90, 100]
+CRF_VALUES = [40, 36, 33, 30, 28, 26, 23, 20, 17, 14]
+
+# Overlay coordinates for each watermark position, 10 px from the edges
+WATERMARK_POSITIONS = {
+    "bottom-right": ("main_w-overlay_w-10", "main_h-overlay_h-10"),
+    "bottom-left": ("10", "main_h-overlay_h-10"),
+    "top-right": ("main_w-overlay_w-10", "10"),
+    "top-left": ("10", "10"),
+    "center": ("(main_w-overlay_w)/2", "(main_h-overlay_h)/2"),
+}
+
+def _render_text_png(text: str, output_path: str, font_size: int = 30, opacity: float = 0.7) -> None:
+    """
+    Rasterize watermark text to a tight, translucent RGBA PNG
+    """
+    try:
+        font = ImageFont.truetype("arial.ttf", font_size)
+    except OSError:
+        try:
+            # Pillow >= 10.1 can scale its bundled default font
+            font = ImageFont.load_default(size=font_size)
+        except TypeError:
+            font = ImageFont.load_default()
+    
+    bbox = ImageDraw.Draw(Image.new('RGBA', (1, 1))).textbbox((0, 0), text, font=font)
+    image = Image.new('RGBA', (max(1, bbox[2] - bbox[0]), max(1, bbox[3] - bbox[1])), (0, 0, 0, 0))
+    ImageDraw.Draw(image).text((-bbox[0], -bbox[1]), text, font=font, fill=(255, 255, 255, int(255 * opacity)))
+    image.save(output_path)
+
+# Rendered watermark PNGs kept in the scratch dir for reuse, keyed by
+# (text, font size, opacity). Bounded, since the text is client-supplied:
+# the least recently used PNG that no encode is reading is deleted to make
+# room. Only touched from the event loop, so no lock is needed.
+WATERMARK_CACHE_SIZE = 32
+_watermarks: "OrderedDict[tuple, list]" = OrderedDict()
+
+@contextlib.asynccontextmanager
+async def _watermark_png(text: str, font_size: int = 30, opacity: float = 0.7) -> AsyncIterator[str]:
+    """
+    Yield the path of a rendered watermark PNG for text, rendering it only
+    the first time a given text/size/opacity is requested; it stays on disk
+    at least until the block exits
+    """
+    key = (text, font_size, opacity)
+    duplicate = None
+    entry = _watermarks.get(key)
+    if entry is None:
+        path = scratch_path(".png")
+        await asyncio.to_thread(_render_text_png, text, path, font_size, opacity)
+        # Another request may have rendered the same text meanwhile
+        entry = _watermarks.setdefault(key, [path, 0])
+        if entry[0] != path:
+            duplicate = path
+    _watermarks.move_to_end(key)
+    
+    # entry[1] counts the encodes reading the file; taken before any other
+    # await, so the entry can't be evicted in between
+    entry[1] += 1
+    try:
+        if duplicate:
+            await asyncio.to_thread(os.remove, duplicate)
+        yield entry[0]
+    finally:
+        entry[1] -= 1
+        stale = []
+        for cached_key in list(_watermarks):
+            if len(_watermarks) <= WATERMARK_CACHE_SIZE:
+                break
+            if _watermarks[cached_key][1] == 0:
+                stale.append(_watermarks.pop(cached_key)[0])
+        for path in stale:
+            with contextlib.suppress(FileNotFoundError):
+                await asyncio.to_thread(os.remove, path)
+
+def _codecs_for(output_path: str) -> Tuple[str, str]:
+    """
+    Pick video and audio encoders the output container supports
+    """
+    if output_path.lower().endswith('.webm'):
+        return 'libvpx-vp9', 'libopus'
+    return 'libx264', 'aac'
+
+def _hw_args(encoder: str, video_args: List[str]) -> List[str]:
+    """
+    Rewrite libx264 rate-control flags for a hardware encoder: -crf becomes
+    the encoder's constant-quality option and x264 presets are dropped
+    """
+    args = []
+    index = 0
+    while index < len(video_args):
+        flag = video_args[index]
+        if flag == '-preset':
+            index += 2
+            continue
+        if flag == '-crf':
+            crf = int(video_args[index + 1])
+            if encoder == 'h264_nvenc':
+                args += ['-rc', 'vbr', '-cq', str(crf), '-b:v', '0']
+            elif encoder == 'h264_qsv':
+                args += ['-global_quality', str(crf)]
+            else:
+                # VideoToolbox quality runs 1-100, higher is better
+                args += ['-q:v', str(max(1, min(100, 100 - crf * 2)))]
+            index += 2
+            continue
+        args.append(flag)
+        index += 1
+    # 4:2:0 like the software encoders; QSV takes it as nv12
+    args += ['-pix_fmt', 'nv12' if encoder == 'h264_qsv' else 'yuv420p']
+    return args
+
+def _thread_args(video_codec: str, threads: int) -> List[str]:
+    """
+    Encoder threading flags. x264 keeps frame-based threading, which gives
+    the best throughput for batch encodes (sliced threads would replace it,
+    trading compression for latency); VP9 needs row-based multithreading
+    switched on to use more than a few cores.
+    """
+    args = ['-threads', str(threads)]
+    if video_codec == 'libx264':
+        args += ['-x264-params', f'threads={threads}:lookahead-threads={min(threads, 2)}']
+    elif video_codec == 'libvpx-vp9':
+        args += ['-row-mt', '1']
+    return args
+
+def _pix_fmt_args(video_codec: str) -> List[str]:
+    """
+    Force 4:2:0 output. Left alone, x264 and VP9 keep a 4:2:2 or 4:4:4
+    source's chroma (screen recordings, ProRes), which browsers can't play.
+    """
+    if video_codec in ('libx264', 'libvpx-vp9'):
+        return ['-pix_fmt', 'yuv420p']
+    return []
 
 class VideoService:
     """Service for video processing operations"""
     
     def __init__(self):
-        self.video_available = VIDEO_AVAILABLE
+        self.video_available = FFMPEG_AVAILABLE
+    
+    async def warmup(self) -> None:
+        """
+        Run the hardware encoder probe, which test-encodes with each
+        candidate, before the first request rather than during it
+        """
+        if self.video_available:
+            await self._hw_encoder_for('libx264')
     
     async def convert_video(
         self, 
@@ -36,37 +204,27 @@ class VideoService:
         """
         Convert video file to different format
         """
-        if not self.video_available:
+        if not FFMPEG_AVAILABLE:
             logger.error("Video processing not available")
             return False
             
         try:
-            # Load video
-            video = VideoFileClip(input_path)
+            # Set quality parameters
+            bitrate = CONVERT_BITRATES.get(quality, CONVERT_BITRATES["medium"])
+            
+            video_codec, audio_codec = _codecs_for(output_path)
+            video_args = ['-b:v', bitrate]
             
             # Resize if resolution specified
             if resolution:
                 width, height = map(int, resolution.split('x'))
-                video = video.resize((width, height))
-            
-            # Set quality parameters
-            quality_settings = {
-                "low": {"bitrate": "500k"},
-                "medium": {"bitrate": "1000k"},
-                "high": {"bitrate": "2000k"}
-            }
+                video_args += ['-vf', f'scale={width}:{height}']
             
             # Export video
-            video.write_videofile(
-                output_path,
-                codec='libx264',
-                **quality_settings.get(quality, quality_settings["medium"])
-            )
+            await self._encode(input_path, output_path, video_codec, video_args, ['-c:a', audio_codec])
             
             # Clean up
-            video.close()
-            if os.path.exists(input_path):
-                os.remove(input_path)
+            await self._unlink(input_path)
             
             return True
             
@@ -84,46 +242,45 @@ class VideoService:
         """
         Compress video file
         """
-        if not self.video_available:
+        if not FFMPEG_AVAILABLE:
             logger.error("Video processing not available")
             return False
             
         try:
-            # Load video
-            video = VideoFileClip(input_path)
+            video_codec, audio_codec = _codecs_for(output_path)
             
             # Calculate bitrate if target size specified
             if target_size_mb:
-                duration = video.duration
+                duration = await probe_duration(input_path)
+                if not duration:
+                    raise ValueError("Could not determine video duration")
                 target_bitrate = (target_size_mb * 8 * 1024) / duration  # kbps
-                bitrate = f"{int(target_bitrate)}k"
+                # Leave room for the audio track inside the size budget
+                video_bitrate = max(int(target_bitrate) - TWO_PASS_AUDIO_KBPS, 50)
+                
+                # Two passes hit the bitrate far more accurately than one,
+                # sparing the user a retry when the file comes out too big
+                await self._encode_two_pass(
+                    input_path, output_path, video_codec, f"{video_bitrate}k",
+                    ['-c:a', audio_codec, '-b:a', f"{TWO_PASS_AUDIO_KBPS}k"]
+                )
             else:
-                # Use quality-based bitrate
-                bitrate_map = {
-                    100: "2000k", 90: "1500k", 80: "1000k", 
-                    70: "750k", 60: "500k", 50: "350k", 
-                    40: "250k", 30: "150k", 20: "100k", 10: "50k"
-                }
+                # Constant quality: the encoder spends bits where the picture
+                # needs them instead of holding a fixed bitrate
+                step = max(bisect.bisect_right(CRF_QUALITY_STEPS, quality) - 1, 0)
+                crf = CRF_VALUES[step]
+                if video_codec == 'libx264':
+                    video_args = ['-crf', str(crf), '-preset', 'veryfast']
+                else:
+                    # VP9 CRF runs 0-63 and needs -b:v 0 to be unconstrained
+                    video_args = ['-crf', str(crf * 63 // 51), '-b:v', '0']
                 
-                bitrate = "1000k"  # default
-                for q in sorted(bitrate_map.keys(), reverse=True):
-                    if quality >= q:
-                        bitrate = bitrate_map[q]
-                        break
-            
-            # Export compressed video
-            video.write_videofile(
-                output_path,
-                codec='libx264',
-                bitrate=bitrate,
-                temp_audiofile='temp-audio.m4a',
-                remove_temp=True
-            )
+                # Export compressed video
+                audio_args = await self._audio_args(input_path, output_path, audio_codec)
+                await self._encode(input_path, output_path, video_codec, video_args, audio_args)
             
             # Clean up
-            video.close()
-            if os.path.exists(input_path):
-                os.remove(input_path)
+            await self._unlink(input_path)
             
             return True
             
@@ -141,34 +298,22 @@ class VideoService:
         """
         Trim video to specified time range
         """
-        if not self.video_available:
+        if not FFMPEG_AVAILABLE:
             logger.error("Video processing not available")
             return False
             
         try:
-            # Load video
-            video = VideoFileClip(input_path)
-            
-            # Set end time if not specified
-            if end_time is None:
-                end_time = video.duration
-            
-            # Trim video
-            trimmed_video = video.subclip(start_time, end_time)
-            
-            # Export trimmed video
-            trimmed_video.write_videofile(
-                output_path,
-                codec='libx264',
-                temp_audiofile='temp-audio.m4a',
-                remove_temp=True
-            )
+            # Stream copy: packets are remuxed, never decoded. Seeking before
+            # -i jumps straight to the nearest keyframe, so the cut starts there.
+            args = ['-ss', str(start_time), '-i', input_path]
+            if end_time is not None:
+                args += ['-t', str(end_time - start_time)]
+            args += ['-map', '0', '-c', 'copy', '-avoid_negative_ts', 'make_zero', output_path]
+            
+            await run_ffmpeg(*args)
             
             # Clean up
-            video.close()
-            trimmed_video.close()
-            if os.path.exists(input_path):
-                os.remove(input_path)
+            await self._unlink(input_path)
             
             return True
             
@@ -180,7 +325,7 @@ class VideoService:
         """
         Merge multiple video files
         """
-        if not self.video_available:
+        if not FFMPEG_AVAILABLE:
             logger.error("Video processing not available")
             return False
             
@@ -188,28 +333,22 @@ class VideoService:
             if not input_paths:
                 return False
             
-            # Load video clips
-            clips = [VideoFileClip(path) for path in input_paths]
-            
-            # Concatenate videos
-            final_video = concatenate_videoclips(clips)
+            # Identical stream parameters can be joined without decoding;
+            # anything else is normalized to the first clip and re-encoded
+            streams = await asyncio.gather(*[probe_streams(path) for path in input_paths])
+            merged = False
+            if all(clip_streams and clip_streams == streams[0] for clip_streams in streams):
+                try:
+                    await concat_copy(input_paths, output_path)
+                    merged = True
+                except FFmpegError as e:
+                    logger.warning(f"Stream-copy merge failed, re-encoding: {str(e)}")
             
-            # Export merged video
-            final_video.write_videofile(
-                output_path,
-                codec='libx264',
-                temp_audiofile='temp-audio.m4a',
-                remove_temp=True
-            )
+            if not merged:
+                await self._concat_reencode(input_paths, output_path, streams)
             
             # Clean up
-            for clip in clips:
-                clip.close()
-            final_video.close()
-            
-            for path in input_paths:
-                if os.path.exists(path):
-                    os.remove(path)
+            await asyncio.gather(*[self._unlink(path) for path in input_paths])
             
             return True
             
@@ -229,33 +368,36 @@ class VideoService:
         """
         Convert video to GIF
         """
-        if not self.video_available:
+        if not FFMPEG_AVAILABLE:
             logger.error("Video processing not available")
             return False
             
         try:
-            # Load video
-            video = VideoFileClip(input_path)
-            
             # Set duration if not specified
             if duration is None:
-                duration = min(10.0, video.duration - start_time)  # Max 10 seconds
-            
-            # Extract clip
-            clip = video.subclip(start_time, start_time + duration)
-            
-            # Resize if width specified
+                total = await probe_duration(input_path)
+                if total is None:
+                    raise ValueError("Could not determine video duration")
+                duration = min(10.0, total - start_time)  # Max 10 seconds
+            
+            # One decode feeds both palettegen and paletteuse through split,
+            # so no palette file is written and the clip is read only once
+            filters = f"fps={fps}"
             if width:
-                clip = clip.resize(width=width)
+                filters += f",scale={width}:-1:flags=lanczos"
+            filters += (
+                ",split[frames][copy];[copy]palettegen=stats_mode=diff[palette];"
+                "[frames][palette]paletteuse=dither=bayer:bayer_scale=5:diff_mode=rectangle"
+            )
             
             # Convert to GIF
-            clip.write_gif(output_path, fps=fps, opt='OptimizePlus', program='ffmpeg')
+            await run_ffmpeg(
+                '-ss', str(start_time), '-t', str(duration), '-i', input_path,
+                '-filter_complex', filters, output_path
+            )
             
             # Clean up
-            video.close()
-            clip.close()
-            if os.path.exists(input_path):
-                os.remove(input_path)
+            await self._unlink(input_path)
             
             return True
             
@@ -267,25 +409,21 @@ class VideoService:
         """
         Extract audio from video
         """
-        if not self.video_available:
+        if not FFMPEG_AVAILABLE:
             logger.error("Video processing not available")
             return False
             
         try:
-            # Load video
-            video = VideoFileClip(input_path)
-            
-            # Extract audio
-            audio = video.audio
-            
-            # Export audio
-            audio.write_audiofile(output_path)
+            # Copy the audio stream as-is when the output container accepts it;
+            # otherwise (e.g. AAC into .mp3) re-encode with the container's
+            # default encoder. Deciding from the probe avoids a failed first run.
+            streams = await probe_streams(input_path)
+            audio = next((stream for stream in streams if stream["type"] == "audio"), None)
+            codec_args = ['-c:a', 'copy'] if audio and can_copy_audio(audio["codec"], output_path) else []
+            await run_ffmpeg('-i', input_path, '-vn', '-map', '0:a:0', *codec_args, output_path)
             
             # Clean up
-            audio.close()
-            video.close()
-            if os.path.exists(input_path):
-                os.remove(input_path)
+            await self._unlink(input_path)
             
             return True
             
@@ -303,56 +441,267 @@ class VideoService:
         """
         Add text watermark to video
         """
-        if not self.video_available:
+        if not FFMPEG_AVAILABLE or not PIL_AVAILABLE:
             logger.error("Video processing not available")
             return False
             
         try:
-            from moviepy.editor import TextClip, CompositeVideoClip
-            
-            # Load video
-            video = VideoFileClip(input_path)
-            
-            # Create text watermark
-            watermark = TextClip(
-                watermark_text,
-                fontsize=30,
-                color='white',
-                font='Arial'
-            ).set_duration(video.duration).set_opacity(0.7)
-            
             # Position watermark
-            if position == "bottom-right":
-                watermark = watermark.set_position(('right', 'bottom'))
-            elif position == "bottom-left":
-                watermark = watermark.set_position(('left', 'bottom'))
-            elif position == "top-right":
-                watermark = watermark.set_position(('right', 'top'))
-            elif position == "top-left":
-                watermark = watermark.set_position(('left', 'top'))
-            else:  # center
-                watermark = watermark.set_position('center')
-            
-            # Composite video with watermark
-            final_video = CompositeVideoClip([video, watermark])
-            
-            # Export video with watermark
-            final_video.write_videofile(
-                output_path,
-                codec='libx264',
-                temp_audiofile='temp-audio.m4a',
-                remove_temp=True
-            )
+            x, y = WATERMARK_POSITIONS.get(position, WATERMARK_POSITIONS["center"])
+            video_codec, audio_codec = _codecs_for(output_path)
+            
+            # Export video with the text watermark, rendered once per distinct
+            # text; ffmpeg composites it in its own filter graph, so no frame
+            # round-trips through Python. Blending in yuv420 keeps the output
+            # 4:2:0, which browsers and hardware decoders play.
+            async with _watermark_png(watermark_text) as watermark_path:
+                await self._encode(
+                    input_path,
+                    output_path,
+                    video_codec,
+                    ['-vf', f"movie={watermark_path}[wm];[in][wm]overlay={x}:{y}:format=yuv420"],
+                    await self._audio_args(input_path, output_path, audio_codec)
+                )
             
             # Clean up
-            video.close()
-            watermark.close()
-            final_video.close()
-            if os.path.exists(input_path):
-                os.remove(input_path)
+            await self._unlink(input_path)
             
             return True
             
         except Exception as e:
             logger.error(f"Error adding watermark to video: {str(e)}")
-            return False 
\ No newline at end of file
+            return False
+    
+    async def _concat_reencode(self, input_paths: List[str], output_path: str, streams: List[List[dict]]) -> None:
+        """
+        Join clips with different sizes, frame rates or codecs by scaling and
+        padding them to the first clip and re-encoding
+        """
+        first_video = next((s for s in streams[0] if s["type"] == "video"), {})
+        width = first_video.get("width") or 1280
+        height = first_video.get("height") or 720
+        fps = first_video.get("fps") or "30"
+        # Keep audio when any clip has some; concat needs an audio pad per
+        # clip, so silent clips get silence of their own length
+        has_audio = [any(s["type"] == "audio" for s in clip) for clip in streams]
+        with_audio = any(has_audio)
+        silent_durations = {
+            index: await probe_duration(path)
+            for index, path in enumerate(input_paths) if with_audio and not has_audio[index]
+        }
+        silence = "anullsrc=r=48000:cl=stereo"
+        
+        video_filter = (
+            f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+            f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1,fps={fps},format=yuv420p"
+        )
+        audio_filter = "aresample=48000,aformat=channel_layouts=stereo"
+        video_codec, audio_codec = _codecs_for(output_path)
+        
+        hw_encoder = await self._hw_encoder_for(video_codec)
+        # Generated silence needs a known length inside the filter graph
+        if hw_encoder and None not in silent_durations.values():
+            # One session on the GPU encoder, fed by a single concat filter graph
+            filters = []
+            for index in range(len(input_paths)):
+                filters.append(f"[{index}:v:0]{video_filter}[v{index}]")
+                if index in silent_durations:
+                    filters.append(f"{silence},atrim=duration={silent_durations[index]}[a{index}]")
+                elif with_audio:
+                    filters.append(f"[{index}:a:0]{audio_filter}[a{index}]")
+            
+            pads = "".join(
+                f"[v{index}][a{index}]" if with_audio else f"[v{index}]" for index in range(len(input_paths))
+            )
+            outputs = "[v][a]" if with_audio else "[v]"
+            filters.append(f"{pads}concat=n={len(input_paths)}:v=1:a={int(with_audio)}{outputs}")
+            
+            args = [arg for path in input_paths for arg in ('-i', path)]
+            args += ['-filter_complex', ";".join(filters), '-map', '[v]']
+            if with_audio:
+                args += ['-map', '[a]', '-c:a', audio_codec]
+            
+            try:
+                await run_ffmpeg(*args, '-c:v', hw_encoder, output_path)
+                return
+            except FFmpegError as e:
+                logger.warning(f"Hardware encoder {hw_encoder} failed, falling back to {video_codec}: {str(e)}")
+        
+        # A single software encoder leaves most cores idle, so normalize every
+        # clip in its own ffmpeg run side by side and join the now-identical
+        # results without decoding them again
+        work_dir = await asyncio.to_thread(tempfile.mkdtemp, dir=os.path.abspath(settings.TEMP_DIR))
+        try:
+            cpu_count = os.cpu_count() or 1
+            threads = max(1, cpu_count // min(len(input_paths), cpu_count))
+            
+            async def normalize_clip(index: int, path: str) -> str:
+                clip_path = os.path.join(work_dir, f'clip_{index:03d}.mkv')
+                args = ['-i', path]
+                if index in silent_durations:
+                    args += ['-f', 'lavfi', '-i', silence]
+                args += ['-map', '0:v:0', '-vf', video_filter, '-c:v', video_codec, *_thread_args(video_codec, threads)]
+                if index in silent_durations:
+                    # The silence stops with the clip's video
+                    args += ['-map', '1:a:0', '-c:a', audio_codec, '-shortest']
+                elif with_audio:
+                    args += ['-map', '0:a:0', '-af', audio_filter, '-c:a', audio_codec]
+                await run_ffmpeg(*args, clip_path)
+                return clip_path
+            
+            clips = await asyncio.gather(*[normalize_clip(index, path) for index, path in enumerate(input_paths)])
+            await concat_copy(clips, output_path)
+        finally:
+            await asyncio.to_thread(shutil.rmtree, work_dir, True)
+    
+    async def _audio_args(self, input_path: str, output_path: str, audio_codec: str) -> List[str]:
+        """
+        Copy the audio track when the output container accepts its codec,
+        otherwise re-encode it with audio_codec
+        """
+        streams = await probe_streams(input_path)
+        audio = next((stream for stream in streams if stream["type"] == "audio"), None)
+        if audio is None or can_copy_audio(audio["codec"], output_path):
+            return ['-c:a', 'copy']
+        return ['-c:a', audio_codec, '-b:a', '128k']
+    
+    async def _hw_encoder_for(self, video_codec: str) -> Optional[str]:
+        """
+        Hardware encoder to use in place of video_codec, if any
+        """
+        if video_codec != 'libx264' or not settings.VIDEO_HW_ENCODING:
+            return None
+        return await asyncio.to_thread(detect_hw_h264_encoder)
+    
+    async def _encode(
+        self,
+        input_path: str,
+        output_path: str,
+        video_codec: str,
+        video_args: List[str],
+        audio_args: List[str],
+        duration: Optional[float] = None
+    ) -> None:
+        """
+        Encode a video with ffmpeg. H.264 goes to a hardware encoder when one
+        is usable; otherwise long inputs are split for parallel encoding.
+        Pass duration when the caller already probed it.
+        """
+        hw_encoder = await self._hw_encoder_for(video_codec)
+        if hw_encoder:
+            # The ASIC is already faster than any CPU split, and consumer
+            # GPUs cap concurrent sessions, so encode in one run
+            try:
+                await run_ffmpeg(
+                    '-i', input_path, '-c:v', hw_encoder, *_hw_args(hw_encoder, video_args), *audio_args, output_path
+                )
+                return
+            except FFmpegError as e:
+                logger.warning(f"Hardware encoder {hw_encoder} failed, falling back to libx264: {str(e)}")
+        
+        if duration is None:
+            duration = await probe_duration(input_path)
+        if duration is None or duration < SEGMENT_THRESHOLD_SECONDS:
+            await run_ffmpeg(
+                '-i', input_path, '-c:v', video_codec, *_thread_args(video_codec, os.cpu_count() or 1),
+                *_pix_fmt_args(video_codec), *video_args, *audio_args, output_path
+            )
+        else:
+            await self._split_encode_concat(input_path, output_path, video_codec, video_args, audio_args)
+    
+    async def _encode_two_pass(
+        self,
+        input_path: str,
+        output_path: str,
+        video_codec: str,
+        bitrate: str,
+        audio_args: List[str]
+    ) -> None:
+        """
+        Two-pass average-bitrate encode: the first pass only analyses the
+        video, the second spends the bit budget where the first found it needed
+        """
+        passlog = scratch_path("_pass")
+        video_args = [
+            '-c:v', video_codec, *_thread_args(video_codec, os.cpu_count() or 1),
+            *_pix_fmt_args(video_codec), '-b:v', bitrate, '-passlogfile', passlog
+        ]
+        try:
+            await run_ffmpeg('-i', input_path, *video_args, '-pass', '1', '-an', '-f', 'null', os.devnull)
+            await run_ffmpeg('-i', input_path, *video_args, '-pass', '2', *audio_args, output_path)
+        finally:
+            # x264 leaves a stats file plus an mbtree file next to it
+            for log_path in await asyncio.to_thread(glob.glob, f"{passlog}*"):
+                await self._unlink(log_path)
+    
+    async def _split_encode_concat(
+        self,
+        input_path: str,
+        output_path: str,
+        video_codec: str,
+        video_args: List[str],
+        audio_args: List[str]
+    ) -> None:
+        """
+        Split the video stream at keyframes, encode the pieces concurrently
+        and stitch them back together with the audio track
+        """
+        work_dir = await asyncio.to_thread(tempfile.mkdtemp, dir=os.path.abspath(settings.TEMP_DIR))
+        try:
+            # Split without re-encoding; cuts land on keyframes
+            await run_ffmpeg(
+                '-i', input_path, '-map', '0:v:0', '-c', 'copy',
+                '-f', 'segment', '-segment_time', str(SEGMENT_SECONDS), '-reset_timestamps', '1',
+                os.path.join(work_dir, 'seg_%03d.mkv')
+            )
+            segments = sorted(name for name in os.listdir(work_dir) if name.startswith('seg_'))
+            
+            # Share the cores between the segments running side by side
+            cpu_count = os.cpu_count() or 1
+            segment_args = [
+                '-c:v', video_codec,
+                *_thread_args(video_codec, max(1, cpu_count // min(len(segments) or 1, cpu_count))),
+                *_pix_fmt_args(video_codec), *video_args
+            ]
+            
+            # run_ffmpeg caps how many of these encode at once
+            async def encode_segment(name: str) -> None:
+                await run_ffmpeg(
+                    '-i', os.path.join(work_dir, name), *segment_args, '-an',
+                    os.path.join(work_dir, f'enc_{name}')
+                )
+            
+            # Audio is encoded in one piece alongside the segments so no
+            # encoder priming gaps appear at the joins
+            audio_path = os.path.join(work_dir, 'audio.mka')
+            
+            async def encode_audio() -> bool:
+                try:
+                    await run_ffmpeg('-i', input_path, '-vn', '-map', '0:a:0', *audio_args, audio_path)
+                    return True
+                except FFmpegError:
+                    # No audio stream
+                    return False
+            
+            has_audio, *_ = await asyncio.gather(
+                encode_audio(), *[encode_segment(name) for name in segments]
+            )
+            
+            # Stitch the encoded pieces back together without re-encoding
+            args = list(CONCAT_LIST_INPUT)
+            if has_audio:
+                args += ['-i', audio_path, '-map', '0:v', '-map', '1:a']
+            await run_ffmpeg(
+                *args, '-c', 'copy', output_path,
+                stdin_data=concat_list([os.path.join(work_dir, f'enc_{name}') for name in segments])
+            )
+        finally:
+            await asyncio.to_thread(shutil.rmtree, work_dir, True)
+    
+    async def _unlink(self, file_path: str) -> None:
+        """
+        Remove a file off the event loop, ignoring it if already gone
+        """
+        forget_file(file_path)
+        with contextlib.suppress(FileNotFoundError):
+            await asyncio.to_thread(os.remove, file_path) 
\ No newline at end of file
@@ -5,38 +5,76 @@ This script demonstrates how to use the various endpoints of the Zenetia Zap API
 """
 
 import requests
+import io
 import json
+import os
 import time
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 # Configuration
 BASE_URL = "http://localhost:8000"
 API_BASE = f"{BASE_URL}/api/v1"
 
+# Endpoints used by the demo
+HEALTH_URL = f"{API_BASE}/core/health"
+FORMATS_URL = f"{API_BASE}/core/formats"
+STATS_URL = f"{API_BASE}/core/stats"
+UPLOAD_URL = f"{API_BASE}/core/upload"
+VALIDATE_URL = f"{API_BASE}/core/validate"
+LOGIN_URL = f"{API_BASE}/auth/login"
+REGISTER_URL = f"{API_BASE}/auth/register"
+PROFILE_URL = f"{API_BASE}/auth/profile"
+VERIFY_URL = f"{API_BASE}/auth/verify"
+ME_URL = f"{API_BASE}/auth/me"
+AUTH_HEALTH_URL = f"{API_BASE}/auth/health"
+MERGE_URL = f"{API_BASE}/pdf/merge"
+TO_WORD_URL = f"{API_BASE}/pdf/to-word"
+
+# (connect, read) timeouts in seconds, so a stalled server fails the demo
+# instead of hanging it; conversions get longer to produce their response
+TIMEOUT = (3.05, 10)
+CONVERSION_TIMEOUT = (3.05, 120)
+
+# Set ZAP_DEMO_VERBOSE=0 to print only status codes, skipping the JSON
+# decode and pretty-print of every response body
+VERBOSE = os.environ.get("ZAP_DEMO_VERBOSE", "1") == "1"
+
 # Note: In a real application, you would get this token from Clerk's frontend SDK
 # This is just for demonstration purposes
 CLERK_JWT_TOKEN = "your_clerk_jwt_token_here"
 
-# Headers with authentication
+# One session for the whole demo, so every call reuses the same keep-alive
+# connection to the server instead of opening a new one
+SESSION = requests.Session()
+
+# Headers with authentication; uploads send only the token and let requests
+# set the multipart Content-Type
+AUTH_HEADERS = {"Authorization": f"Bearer {CLERK_JWT_TOKEN}"}
 HEADERS = {
-    "Authorization": f"Bearer {CLERK_JWT_TOKEN}",
+    **AUTH_HEADERS,
     "Content-Type": "application/json"
 }
 
 def print_response(response, title="Response"):
     """Pretty print API response"""
+    if not VERBOSE:
+        print(f"{title}: {response.status_code}")
+        return
+    
     print(f"\n--- {title} ---")
     print(f"Status Code: {response.status_code}")
     try:
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
-    except:
+        body = response.json()
+    except ValueError:
         print(f"Response: {response.text}")
+    else:
+        print(f"Response: {json.dumps(body, indent=2, ensure_ascii=False)}")
     print("-" * 40)
 
 def demo_health_check():
     """Test health check endpoint"""
     print("🏥 Testing Health Check")
-    response = requests.get(f"{API_BASE}/core/health")
+    response = SESSION.get(HEALTH_URL, timeout=TIMEOUT)
     print_response(response, "Health Check")
 
 def demo_authentication():
@@ -48,7 +86,7 @@ def demo_authentication():
         "email": "admin@zenetia.com",
         "password": "admin123"
     }
-    response = requests.post(f"{API_BASE}/auth/login", params=login_data)
+    response = SESSION.post(LOGIN_URL, params=login_data, timeout=TIMEOUT)
     print_response(response, "Login")
     
     if response.status_code == 200:
@@ -56,7 +94,7 @@ def demo_authentication():
         headers = {"Authorization": f"Bearer {token}"}
         
         # Get user profile
-        profile_response = requests.get(f"{API_BASE}/auth/profile", headers=headers)
+        profile_response = SESSION.get(PROFILE_URL, headers=headers, timeout=TIMEOUT)
         print_response(profile_response, "User Profile")
         
         return token
@@ -67,33 +105,25 @@ def demo_core_endpoints():
     print("⚡ Testing Core Endpoints")
     
     # Get supported formats
-    response = requests.get(f"{API_BASE}/core/formats")
+    response = SESSION.get(FORMATS_URL, timeout=TIMEOUT)
     print_response(response, "Supported Formats")
     
     # Get usage stats
-    response = requests.get(f"{API_BASE}/core/stats")
+    response = SESSION.get(STATS_URL, timeout=TIMEOUT)
     print_response(response, "Usage Statistics")
 
 def demo_file_upload():
     """Test file upload (using a simple text file as example)"""
     print("📁 Testing File Upload")
     
-    # Create a simple test file
-    test_file_path = Path("test_upload.txt")
-    test_file_path.write_text("This is a test file for upload demonstration.")
+    # Upload a small test file straight from memory
+    test_file = io.BytesIO(b"This is a test file for upload demonstration.")
+    files = {'file': ('test_upload.txt', test_file, 'text/plain')}
+    response = SESSION.post(UPLOAD_URL, files=files, timeout=TIMEOUT)
+    print_response(response, "File Upload")
     
-    try:
-        with open(test_file_path, 'rb') as f:
-            files = {'file': ('test_upload.txt', f, 'text/plain')}
-            response = requests.post(f"{API_BASE}/core/upload", files=files)
-            print_response(response, "File Upload")
-            
-            if response.status_code == 200:
-                return response.json().get("file_id")
-    finally:
-        # Clean up test file
-        if test_file_path.exists():
-            test_file_path.unlink()
+    if response.status_code == 200:
+        return response.json().get("file_id")
     
     return None
 
@@ -101,19 +131,11 @@ def demo_file_validation():
     """Test file validation"""
     print("✅ Testing File Validation")
     
-    # Create a simple test file
-    test_file_path = Path("test_validation.txt")
-    test_file_path.write_text("This is a test file for validation.")
-    
-    try:
-        with open(test_file_path, 'rb') as f:
-            files = {'file': ('test_validation.txt', f, 'text/plain')}
-            response = requests.post(f"{API_BASE}/core/validate", files=files)
-            print_response(response, "File Validation")
-    finally:
-        # Clean up test file
-        if test_file_path.exists():
-            test_file_path.unlink()
+    # Validate a small test file straight from memory
+    test_file = io.BytesIO(b"This is a test file for validation.")
+    files = {'file': ('test_validation.txt', test_file, 'text/plain')}
+    response = SESSION.post(VALIDATE_URL, files=files, timeout=TIMEOUT)
+    print_response(response, "File Validation")
 
 def demo_user_registration():
     """Test user registration"""
@@ -125,34 +147,38 @@ def demo_user_registration():
         "full_name": "Test User"
     }
     
-    response = requests.post(f"{API_BASE}/auth/register", json=user_data)
+    response = SESSION.post(REGISTER_URL, json=user_data, timeout=TIMEOUT)
     print_response(response, "User Registration")
 
-def test_auth_endpoints():
-    """Test authentication endpoints"""
-    print("🔐 Testing Authentication Endpoints...")
+def test_auth_endpoints(session):
+    """Test authentication endpoints; returns the report"""
+    out = io.StringIO()
+    print("🔐 Testing Authentication Endpoints...", file=out)
     
     # Test token verification
     try:
-        response = requests.post(f"{API_BASE}/auth/verify", headers=HEADERS)
-        print(f"Token verification: {response.status_code}")
+        response = session.post(VERIFY_URL, headers=HEADERS, timeout=TIMEOUT)
+        print(f"Token verification: {response.status_code}", file=out)
         if response.status_code == 200:
-            print(f"Response: {response.json()}")
+            print(f"Response: {response.json()}", file=out)
     except Exception as e:
-        print(f"Auth test failed: {e}")
+        print(f"Auth test failed: {e}", file=out)
     
     # Test user profile
     try:
-        response = requests.get(f"{API_BASE}/auth/me", headers=HEADERS)
-        print(f"User profile: {response.status_code}")
+        response = session.get(ME_URL, headers=HEADERS, timeout=TIMEOUT)
+        print(f"User profile: {response.status_code}", file=out)
         if response.status_code == 200:
-            print(f"User: {response.json()}")
+            print(f"User: {response.json()}", file=out)
     except Exception as e:
-        print(f"Profile test failed: {e}")
+        print(f"Profile test failed: {e}", file=out)
+    
+    return out.getvalue()
 
-def test_pdf_merge():
-    """Test PDF merging functionality"""
-    print("\n📄 Testing PDF Merge...")
+def test_pdf_merge(session):
+    """Test PDF merging functionality; returns the report"""
+    out = io.StringIO()
+    print("\n📄 Testing PDF Merge...", file=out)
     
     # Create sample PDF files (in a real scenario, you'd have actual PDF files)
     files = [
@@ -161,58 +187,69 @@ def test_pdf_merge():
     ]
     
     try:
-        response = requests.post(
-            f"{API_BASE}/pdf/merge",
+        response = session.post(
+            MERGE_URL,
             files=files,
-            headers={"Authorization": f"Bearer {CLERK_JWT_TOKEN}"}
+            headers=AUTH_HEADERS,
+            timeout=CONVERSION_TIMEOUT
         )
-        print(f"PDF Merge: {response.status_code}")
+        print(f"PDF Merge: {response.status_code}", file=out)
         if response.status_code == 200:
             result = response.json()
-            print(f"Conversion ID: {result['conversion_id']}")
-            print(f"Download URL: {result['download_url']}")
+            print(f"Conversion ID: {result['conversion_id']}", file=out)
+            print(f"Download URL: {result['download_url']}", file=out)
     except Exception as e:
-        print(f"PDF merge test failed: {e}")
+        print(f"PDF merge test failed: {e}", file=out)
+    
+    return out.getvalue()
 
-def test_pdf_to_word():
-    """Test PDF to Word conversion"""
-    print("\n📝 Testing PDF to Word Conversion...")
+def test_pdf_to_word(session):
+    """Test PDF to Word conversion; returns the report"""
+    out = io.StringIO()
+    print("\n📝 Testing PDF to Word Conversion...", file=out)
     
     files = {
         "file": ("sample.pdf", b"dummy pdf content", "application/pdf")
     }
     
     try:
-        response = requests.post(
-            f"{API_BASE}/pdf/to-word",
+        response = session.post(
+            TO_WORD_URL,
             files=files,
-            headers={"Authorization": f"Bearer {CLERK_JWT_TOKEN}"}
+            headers=AUTH_HEADERS,
+            timeout=CONVERSION_TIMEOUT
         )
-        print(f"PDF to Word: {response.status_code}")
+        print(f"PDF to Word: {response.status_code}", file=out)
         if response.status_code == 200:
             result = response.json()
-            print(f"Conversion ID: {result['conversion_id']}")
-            print(f"Download URL: {result['download_url']}")
-            print(f"User ID: {result.get('user_id')}")
+            print(f"Conversion ID: {result['conversion_id']}", file=out)
+            print(f"Download URL: {result['download_url']}", file=out)
+            print(f"User ID: {result.get('user_id')}", file=out)
     except Exception as e:
-        print(f"PDF to Word test failed: {e}")
+        print(f"PDF to Word test failed: {e}", file=out)
+    
+    return out.getvalue()
 
 def test_system_health():
-    """Test system health endpoints"""
+    """Test system health endpoints; returns whether the server is up"""
     print("\n🏥 Testing System Health...")
     
-    # Test main health endpoint
+    # Test main health endpoint; it doubles as the connectivity check
     try:
-        response = requests.get(f"{API_BASE}/core/health")
+        response = SESSION.get(HEALTH_URL, timeout=TIMEOUT)
         print(f"System Health: {response.status_code}")
-        if response.status_code == 200:
-            print(f"System: {response.json()['status']}")
+        if response.status_code != 200:
+            print("\n❌ Server is not running or not healthy!")
+            return False
+        print(f"System: {response.json()['status']}")
     except Exception as e:
-        print(f"System health test failed: {e}")
+        print(f"\n❌ Cannot connect to server: {e}")
+        print("Make sure the server is running on http://localhost:8000")
+        return False
     
     # Test auth health endpoint
     try:
-        response = requests.get(f"{API_BASE}/auth/health")
+        response = SESSION.get(AUTH_HEALTH_URL, timeout=TIMEOUT)
         print(f"Auth Health: {response.status_code}")
         if response.status_code == 200:
             health = response.json()
@@ -220,6 +257,22 @@ def test_system_health():
             print(f"Clerk Integration: {health['clerk_integration']}")
     except Exception as e:
         print(f"Auth health test failed: {e}")
+    
+    return True
+
+def run_concurrently(*demos):
+    """
+    Run independent demos at the same time, each on its own thread with its
+    own session (requests.Session is not documented as thread-safe), then
+    print each one's report in the order given
+    """
+    def run(demo):
+        with requests.Session() as session:
+            return demo(session)
+    
+    with ThreadPoolExecutor(max_workers=len(demos)) as pool:
+        for report in pool.map(run, demos):
+            print(report, end="")
 
 def main():
     """Main demo function"""
@@ -232,22 +285,12 @@ def main():
     print("3. Start the FastAPI server: uvicorn app.main:app --reload")
     print("4. Install dependencies: pip install -r requirements.txt")
     
-    # Test if server is running
-    try:
-        response = requests.get(f"{API_BASE}/core/health")
-        if response.status_code != 200:
-            print("\n❌ Server is not running or not healthy!")
-            return
-    except Exception as e:
-        print(f"\n❌ Cannot connect to server: {e}")
-        print("Make sure the server is running on http://localhost:8000")
+    # Run tests; the health check also tells whether the server is up
+    if not test_system_health():
         return
     
     print("\n✅ Server is running!")
     
-    # Run tests
-    test_system_health()
-    
     if CLERK_JWT_TOKEN == "your_clerk_jwt_token_here":
         print("\n⚠️  Skipping authenticated tests - please set a real Clerk JWT token")
         print("To get a token:")
@@ -255,11 +298,11 @@ def main():
         print("2. Use Clerk's session.getToken() method")
         print("3. Update CLERK_JWT_TOKEN in this script")
     else:
-        test_auth_endpoints()
-        test_pdf_merge()
-        test_pdf_to_word()
+        # None of these depends on another, so their round trips overlap
+        run_concurrently(test_auth_endpoints, test_pdf_merge, test_pdf_to_word)
     
     print("\n✅ Demo completed!")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    with SESSION:
+        main() 
\ No newline at end of file